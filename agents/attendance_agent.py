@@ -1,7 +1,7 @@
 # agents/attendance_agent.py
 # Read-only Attendance Agent (HR-driven model)
 
-from db.database import get_working_hours
+from db.database import get_hours_summary, get_working_hours
 
 
 class AttendanceAgent:
@@ -24,4 +24,24 @@ class AttendanceAgent:
             "date": date,
             "start_time": working_hours["start_time"],
             "end_time": working_hours["end_time"]
-        }
\ No newline at end of file
+        }
+
+    def get_hours_summary(self, start_date, end_date, employee_id=None, department=None):
+        """
+        Total / average / overtime hours for a period.
+        Per employee when an employee or department is given,
+        otherwise per department.
+        """
+
+        if not start_date or not end_date:
+            return []
+
+        group_by = "employee" if employee_id or department else "department"
+
+        return get_hours_summary(
+            start_date,
+            end_date,
+            group_by=group_by,
+            employee_id=int(employee_id) if employee_id else None,
+            department=department
+        )
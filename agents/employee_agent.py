@@ -1,15 +1,14 @@
 # agents/employee_agent.py
 # This file defines EmployeeAgent.
-# It handles employee registration and employee search.
+# It handles employee registration, employee search and the directory.
 # It does NOT contain any AI logic.
 # It uses database.py for all DB operations.
 
-from db.database import (
-    add_employee,
-    employee_exists,
-    get_employee_by_id,
-    get_employee_by_name
-)
+from db.database import add_employee, employee_exists, get_employee_page
+from utils.entity_normalizer import employee_index, normalize_employee
+
+# Employees per directory page
+DIRECTORY_PAGE_SIZE = 25
 
 
 class EmployeeAgent:
@@ -17,6 +16,7 @@ class EmployeeAgent:
     EmployeeAgent handles:
     - Employee registration
     - Finding employees
+    - Listing employees (paginated directory)
     """
 
     def register_employee(self, name, email, department):
@@ -37,6 +37,12 @@ class EmployeeAgent:
         department = department.strip().upper()
         
         employee_id = add_employee(name, email, department)
+        employee_index.add({
+            "employee_id": employee_id,
+            "name": name,
+            "email": email,
+            "department": department
+        })
 
         return {
             "status": "success",
@@ -44,56 +50,65 @@ class EmployeeAgent:
             "employee_id": employee_id
         }
 
-    def find_employee(self, employee_id=None, name=None):
+    def find_employee(self, employee_id=None, name=None, email=None, department=None):
         """
-        Find employee by ID or by name.
+        Find employee by ID, email or name.
 
         Rules:
         - If employee_id is provided, search by ID
-        - If name is provided, search by name
-        - If multiple employees found with same name, return list
+        - If name is provided, search by name (exact, then partial)
+        - Email / department narrow down employees sharing a name
+        - If several employees still match, return them ranked
         """
 
-        # Case 1: Search by employee ID
-        if employee_id is not None:
-            employee = get_employee_by_id(employee_id)
+        if employee_id is None and name is None and email is None:
+            return {
+                "status": "error",
+                "message": "Please provide employee_id or name."
+            }
 
-            if employee:
-                return {
-                    "status": "found",
-                    "employee": employee
-                }
+        result = normalize_employee({
+            "employee_id": employee_id,
+            "name": name,
+            "email": email,
+            "department": department
+        })
 
+        if result["status"] == "resolved":
             return {
-                "status": "not_found",
-                "message": "Employee not found with given ID."
+                "status": "found",
+                "employee": result["employee"]
             }
 
-        # Case 2: Search by name
-        if name is not None:
-            employees = get_employee_by_name(name)
-
-            if not employees:
-                return {
-                    "status": "not_found",
-                    "message": "No employee found with this name."
-                }
-
-            # Multiple employees with same name
-            if len(employees) > 1:
-                return {
-                    "status": "multiple_found",
-                    "message": "Multiple employees found with this name.",
-                    "employees": employees
-                }
-
-            # Only one employee found
+        # Multiple employees match
+        if result["status"] == "ambiguous":
             return {
-                "status": "found",
-                "employee": employees[0]
+                "status": "multiple_found",
+                "message": "Multiple employees found with this name.",
+                "employees": result["candidates"]
             }
 
         return {
-            "status": "error",
-            "message": "Please provide employee_id or name."
-        }
\ No newline at end of file
+            "status": "not_found",
+            "message": result["message"]
+        }
+
+    def list_employees(self, department=None, after_id=0, limit=DIRECTORY_PAGE_SIZE):
+        """
+        One page of the employee directory, in employee_id order.
+
+        next_after_id is the cursor for the following page
+        (None on the last page).
+        """
+        department = department.strip().upper() if department else None
+
+        # One extra row tells whether another page follows
+        rows = get_employee_page(department, int(after_id or 0), limit + 1)
+        employees = rows[:limit]
+
+        return {
+            "status": "success" if employees else "not_found",
+            "department": department,
+            "employees": employees,
+            "next_after_id": employees[-1]["employee_id"] if len(rows) > limit else None
+        }
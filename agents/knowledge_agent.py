@@ -9,12 +9,16 @@ from utils.vector_store import VectorStore
 
 
 class KnowledgeAgent:
-    def __init__(self):
+    def __init__(self, watch=True):
         """
         Initialize vector store and load HR policies.
+        Policy file edits are picked up in the background
+        (watch=False leaves starting the watcher to the caller).
         """
         self.vector_store = VectorStore("data/hr_policy.txt")
         self.vector_store.load()
+        if watch:
+            self.vector_store.start_watching()
 
     # --------------------------------------------------
     # Internal helper (CRITICAL FIX)
@@ -2,7 +2,6 @@
 # Handles daily work report logic and PDF generation
 # HR-driven attendance model
 
-from datetime import datetime
 from db.database import get_employee_by_id, get_working_hours
 from utils.report_generator import generate_daily_report_pdf
 
@@ -33,12 +32,8 @@ class ReportAgent:
         start_time = working_hours_data["start_time"]
         end_time = working_hours_data["end_time"]
 
-        # ---------- Calculate working hours ----------
-        start_dt = datetime.strptime(start_time, "%H:%M")
-        end_dt = datetime.strptime(end_time, "%H:%M")
-
-        working_seconds = (end_dt - start_dt).seconds
-        working_hours = round(working_seconds / 3600, 2)
+        # ---------- Working hours (computed once at write time) ----------
+        working_hours = round(working_hours_data["duration_minutes"] / 60, 2)
 
         # ---------- Prepare report data ----------
         report_data = {
@@ -0,0 +1,278 @@
+# benchmarks/harness.py
+# Shared helpers for benchmarks: scratch DB, stubbed LLM,
+# per-stage timers, seeding and latency statistics.
+# Import this module BEFORE anything from db/, agents/ or orchestrator,
+# so the scratch database and reports directory are picked up.
+
+import inspect
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# --------------------------------------------------
+# Sandbox (must run before importing the app)
+# --------------------------------------------------
+
+SANDBOX_DIR = tempfile.mkdtemp(prefix="hr_bench_")
+os.environ.setdefault("HR_DB_PATH", os.path.join(SANDBOX_DIR, "hr_bench.db"))
+os.environ.setdefault("HR_REPORTS_DIR", os.path.join(SANDBOX_DIR, "reports"))
+os.environ.setdefault("HR_AUDIT_LOG", os.path.join(SANDBOX_DIR, "audit_log.jsonl"))
+
+# Policy file paths are relative to the repo root
+os.chdir(REPO_ROOT)
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+
+# --------------------------------------------------
+# Stubbed LLM
+# --------------------------------------------------
+
+_HINT_RE = re.compile(r"Hint: intent is likely '([a-z_]+)'")
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.]+")
+_DATE_RE = re.compile(r"\b\d{4}-\d{2}-\d{2}\b|\btoday\b")
+_TIME_RE = re.compile(r"\b\d{1,2}:\d{2}\b")
+_ID_RE = re.compile(r"\b(?:id|emp|employee)\s*#?\s*(\d+)\b|\bof\s+(\d+)\b")
+_DEPT_RE = re.compile(r"\b(?:in|to|department)\s+([A-Z]{2,})\b")
+_NAME_RE = re.compile(r"\b(?:named|name is|find)\s+([A-Z][a-z]+)")
+
+
+class StubLLM:
+    """
+    Deterministic stand-in for call_ollama.
+    Extracts entities with regexes and sleeps a fixed latency,
+    so runs are reproducible and comparable between commits.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, system_prompt, user_prompt):
+        with self._lock:
+            self.calls += 1
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        hint = _HINT_RE.search(system_prompt)
+        times = _TIME_RE.findall(user_prompt)
+        date = _DATE_RE.search(user_prompt)
+        email = _EMAIL_RE.search(user_prompt)
+        emp = _ID_RE.search(user_prompt)
+        dept = _DEPT_RE.search(user_prompt)
+        name = _NAME_RE.search(user_prompt)
+
+        if hint:
+            intent = hint.group(1)
+        elif "find" in user_prompt.lower():
+            intent = "find_employee"
+        else:
+            intent = "unknown"
+
+        data = {
+            "intent": intent,
+            "employee_id": (emp.group(1) or emp.group(2)) if emp else None,
+            "name": name.group(1) if name else None,
+            "email": email.group(0) if email else None,
+            "department": dept.group(1) if dept else None,
+            "date": date.group(0) if date else None,
+            "start_time": times[0] if len(times) > 0 else None,
+            "end_time": times[1] if len(times) > 1 else None,
+            "query": None
+        }
+
+        return "Here is the JSON:\n" + json.dumps(data)
+
+
+def install_stub_llm(latency=0.0):
+    """
+    Route every parse_intent LLM call to a StubLLM.
+    """
+    import utils.intent_parser as intent_parser
+
+    stub = StubLLM(latency=latency)
+    intent_parser.call_ollama = stub
+    return stub
+
+
+# --------------------------------------------------
+# Per-stage timers
+# --------------------------------------------------
+
+def _is_repo_module(module):
+    path = getattr(module, "__file__", None)
+    if not isinstance(path, str):
+        return False
+
+    try:
+        return Path(path).resolve().is_relative_to(REPO_ROOT)
+    except (OSError, ValueError):
+        return False
+
+
+class StageTimer:
+    """
+    Records wall-clock durations (seconds) per stage.
+    Stages nest, so each stage's time is inclusive of its callees.
+    """
+
+    def __init__(self):
+        self.samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds):
+        with self._lock:
+            self.samples.setdefault(stage, []).append(seconds)
+
+    def wrap(self, stage, fn):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.record(stage, time.perf_counter() - start)
+
+        timed.__wrapped__ = fn
+        return timed
+
+    def instrument(self, owner, attr, stage):
+        """
+        Wrap owner.attr and every module-level alias of the same
+        function (modules that did `from x import attr`).
+        Only the repo's own modules are patched: looking attributes up on
+        third-party lazy modules (transformers) can trigger imports.
+        """
+        original = getattr(owner, attr)
+        wrapped = self.wrap(stage, original)
+        setattr(owner, attr, wrapped)
+
+        for module in list(sys.modules.values()):
+            if module is None or module is owner or not _is_repo_module(module):
+                continue
+            if getattr(module, attr, None) is original:
+                setattr(module, attr, wrapped)
+
+
+def instrument_pipeline(timer):
+    """
+    Attach stage timers along parse -> orchestrator -> agents -> DB/vector/PDF.
+    """
+    import db.database as database
+    import main
+    import orchestrator
+    import utils.intent_parser as intent_parser
+    import utils.report_generator as report_generator
+    from agents.attendance_agent import AttendanceAgent
+    from agents.employee_agent import EmployeeAgent
+    from agents.knowledge_agent import KnowledgeAgent
+    from agents.report_agent import ReportAgent
+    from utils.vector_store import VectorStore
+
+    timer.instrument(intent_parser, "call_ollama", "llm")
+    timer.instrument(intent_parser, "parse_intent", "parse_intent")
+
+    timer.instrument(orchestrator.Orchestrator, "handle_intent", "orchestrator")
+    timer.instrument(orchestrator.Orchestrator, "handle_followup", "orchestrator")
+
+    for cls, methods in [
+        (EmployeeAgent, ["register_employee", "find_employee"]),
+        (AttendanceAgent, ["get_attendance"]),
+        (ReportAgent, ["generate_daily_report"]),
+        (KnowledgeAgent, ["search_policy"])
+    ]:
+        for method in methods:
+            timer.instrument(cls, method, "agents")
+
+    for name in dir(database):
+        fn = getattr(database, name)
+        if callable(fn) and getattr(fn, "__module__", None) == database.__name__ and not name.startswith("_"):
+            if name not in ("get_connection", "create_tables") and not inspect.isgeneratorfunction(fn):
+                timer.instrument(database, name, "db")
+
+    timer.instrument(VectorStore, "search", "vector")
+    timer.instrument(report_generator, "generate_daily_report_pdf", "pdf")
+
+    timer.instrument(main, "process_turn", "turn")
+
+
+# --------------------------------------------------
+# Seeding
+# --------------------------------------------------
+
+DEPARTMENTS = ["IT", "HR", "FINANCE", "SALES"]
+
+
+def seed_database(employees=200, days=30, start_date="2026-01-01"):
+    """
+    Insert deterministic employees and attendance rows.
+    """
+    from datetime import date, timedelta
+
+    from db.database import add_employee, assign_working_hours, employee_exists
+
+    first_day = date.fromisoformat(start_date)
+
+    for i in range(1, employees + 1):
+        email = f"emp{i}@example.com"
+        if employee_exists(email):
+            continue
+
+        employee_id = add_employee(f"Emp{i}", email, DEPARTMENTS[i % len(DEPARTMENTS)])
+
+        for d in range(days):
+            assign_working_hours(
+                employee_id,
+                (first_day + timedelta(days=d)).isoformat(),
+                "09:00",
+                "18:00"
+            )
+
+
+# --------------------------------------------------
+# Statistics
+# --------------------------------------------------
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+
+    k = (len(sorted_values) - 1) * pct / 100
+    lower = int(k)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (k - lower)
+
+
+def summarize(samples, wall_seconds):
+    """
+    Latency percentiles (ms) and throughput (calls/s) for a list of seconds.
+    """
+    values = sorted(samples)
+
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "mean_ms": round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+        "throughput_per_s": round(len(values) / wall_seconds, 2) if wall_seconds else 0.0
+    }
+
+
+def print_table(title, rows):
+    print(f"\n{title}")
+    print(f"{'stage':<16}{'count':>8}{'p50 ms':>11}{'p95 ms':>11}{'p99 ms':>11}{'ops/s':>11}")
+
+    for stage, stats in rows.items():
+        print(
+            f"{stage:<16}{stats['count']:>8}{stats['p50_ms']:>11.3f}"
+            f"{stats['p95_ms']:>11.3f}{stats['p99_ms']:>11.3f}{stats['throughput_per_s']:>11.2f}"
+        )
@@ -0,0 +1,259 @@
+# benchmarks/load_test.py
+# Concurrent session load generator for the Orchestrator
+# Simulates N users running realistic multi-turn flows at the same time
+# (one thread per session) against a scratch DB with a stubbed LLM,
+# and reports throughput, tail latency, DB lock contention and memory.
+# Turns shed by the LLM scheduler (answered by the rule-based fallback)
+# and intent cache hits skip the LLM, so both are reported per level:
+# a level with many of them is not comparable with one without.
+#
+# Usage:
+#   python -m benchmarks.load_test --sessions 1,10,50,100 --duration 20 --llm-latency 0.3
+
+from benchmarks import harness
+
+import argparse
+import json
+import random
+import resource
+import sqlite3
+import threading
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from utils import metrics
+from utils.llm_scheduler import PRIORITIES, llm_scheduler
+
+# --------------------------------------------------
+# Flows (each returns the list of turns for one conversation)
+# --------------------------------------------------
+
+def _registration(rng, session, n):
+    return [
+        f"register employee named User{session}x{n}",
+        f"user{session}x{n}@example.com, {rng.choice(harness.DEPARTMENTS)}"
+    ]
+
+
+def _assignment(rng, session, n):
+    # Unique date per session and iteration, so every flow writes a row
+    day = date(2027, 1, 1) + timedelta(days=session * 1000 + n)
+    return [
+        "assign working hours",
+        str(rng.randint(1, 50)),
+        day.isoformat(),
+        "09:00",
+        "18:00"
+    ]
+
+
+def _report(rng, session, n):
+    return [
+        "daily report",
+        str(rng.randint(1, 50))
+    ]
+
+
+def _attendance(rng, session, n):
+    return [f"show working hour of {rng.randint(1, 50)} on 2026-01-{rng.randint(1, 28):02d}"]
+
+
+def _policy(rng, session, n):
+    return [rng.choice([
+        "what is the leave policy",
+        "tell me about attendance policy",
+        "office timing policy"
+    ])]
+
+
+FLOWS = {
+    "registration": _registration,
+    "assignment": _assignment,
+    "report": _report,
+    "attendance": _attendance,
+    "policy": _policy
+}
+
+
+# --------------------------------------------------
+# Session worker
+# --------------------------------------------------
+
+class LoadStats:
+    def __init__(self):
+        self.turns = []
+        self.flows = {}
+        self.errors = {}
+        self.lock_errors = 0
+        self._lock = threading.Lock()
+
+    def turn(self, seconds):
+        with self._lock:
+            self.turns.append(seconds)
+
+    def flow(self, name, seconds):
+        with self._lock:
+            self.flows.setdefault(name, []).append(seconds)
+
+    def error(self, e):
+        with self._lock:
+            key = type(e).__name__
+            self.errors[key] = self.errors.get(key, 0) + 1
+            if isinstance(e, sqlite3.OperationalError) and "locked" in str(e):
+                self.lock_errors += 1
+
+
+def _run_session(main, orchestrator, session, deadline, seed, stats):
+    rng = random.Random(seed + session)
+    session_id = f"load-{session}"
+    n = 0
+
+    while time.monotonic() < deadline:
+        name = rng.choice(list(FLOWS))
+        turns = FLOWS[name](rng, session, n)
+        n += 1
+
+        flow_start = time.perf_counter()
+        for utterance in turns:
+            start = time.perf_counter()
+            try:
+                main.process_turn(orchestrator, utterance, session_id)
+            except Exception as e:
+                stats.error(e)
+                orchestrator.reset_state(session_id)
+                break
+            finally:
+                stats.turn(time.perf_counter() - start)
+        stats.flow(name, time.perf_counter() - flow_start)
+
+
+# --------------------------------------------------
+# Runner
+# --------------------------------------------------
+
+def _db_seconds():
+    histograms = metrics.snapshot()["histograms"]
+    return sum(h["sum"] for name, h in histograms.items() if name.startswith("db."))
+
+
+def _llm_stats():
+    """
+    LLM calls served, shed per priority class and intent cache hits
+    since the last metrics reset.
+    """
+    snapshot = metrics.snapshot()
+    counters = snapshot["counters"]
+
+    return {
+        "llm_calls": sum(
+            h["count"] for name, h in snapshot["histograms"].items()
+            if name.startswith("llm.queue_wait.")
+        ),
+        "llm_shed": {p: counters.get(f"llm.shed.{p}", 0) for p in PRIORITIES},
+        "intent_cache_hits": counters.get("intent_cache.hits", 0),
+        "intent_cache_misses": counters.get("intent_cache.misses", 0)
+    }
+
+
+def run_level(main, orchestrator, sessions, duration, seed=42):
+    """
+    Run `sessions` concurrent users for `duration` seconds.
+    """
+    stats = LoadStats()
+    metrics.reset()
+
+    traced_before, _ = tracemalloc.get_traced_memory()
+    deadline = time.monotonic() + duration
+
+    threads = [
+        threading.Thread(
+            target=_run_session,
+            args=(main, orchestrator, s, deadline, seed, stats),
+            daemon=True
+        )
+        for s in range(sessions)
+    ]
+
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - started
+
+    traced_after, traced_peak = tracemalloc.get_traced_memory()
+    turn_stats = harness.summarize(stats.turns, wall)
+
+    return {
+        "sessions": sessions,
+        "wall_seconds": round(wall, 3),
+        "turns": turn_stats,
+        "flows": {name: harness.summarize(s, wall) for name, s in sorted(stats.flows.items())},
+        "errors": stats.errors,
+        "db_lock_errors": stats.lock_errors,
+        **_llm_stats(),
+        "db_time_share": round(_db_seconds() / (sum(stats.turns) or 1), 4),
+        "memory_growth_kb": round((traced_after - traced_before) / 1024, 1),
+        "memory_peak_kb": round(traced_peak / 1024, 1),
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "live_sessions": len(orchestrator.sessions)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent session load test.")
+    parser.add_argument("--sessions", default="1,10,50", help="Comma separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per level")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Stub LLM latency (s)")
+    parser.add_argument("--llm-concurrency", type=int, default=None,
+                        help="LLM calls served at once (default: HR_LLM_CONCURRENCY); "
+                             "raise it to measure without load shedding")
+    parser.add_argument("--employees", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="Write results as JSON")
+    args = parser.parse_args()
+
+    harness.install_stub_llm(latency=args.llm_latency)
+    if args.llm_concurrency:
+        llm_scheduler.concurrency = args.llm_concurrency
+    harness.seed_database(employees=args.employees, days=28)
+
+    import main as app
+    from orchestrator import Orchestrator
+
+    orchestrator = Orchestrator()
+    metrics.enable()
+    tracemalloc.start()
+
+    results = []
+    print(
+        f"{'sessions':>9}{'turns/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+        f"{'errors':>8}{'locked':>8}{'db %':>7}{'mem +KB':>10}"
+        f"{'llm':>8}{'shed':>8}{'cached':>8}"
+    )
+
+    for level in [int(x) for x in args.sessions.split(",") if x.strip()]:
+        result = run_level(app, orchestrator, level, args.duration, seed=args.seed)
+        results.append(result)
+
+        turns = result["turns"]
+        print(
+            f"{level:>9}{turns['throughput_per_s']:>10.2f}{turns['p50_ms']:>10.1f}"
+            f"{turns['p95_ms']:>10.1f}{turns['p99_ms']:>10.1f}"
+            f"{sum(result['errors'].values()):>8}{result['db_lock_errors']:>8}"
+            f"{result['db_time_share'] * 100:>6.1f}%{result['memory_growth_kb']:>10.1f}"
+            f"{result['llm_calls']:>8}{sum(result['llm_shed'].values()):>8}"
+            f"{result['intent_cache_hits']:>8}"
+        )
+
+    tracemalloc.stop()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# benchmarks/replay.py
+# End-to-end replay benchmark
+# Replays a corpus of conversations through main.process_turn
+# (parse_intent -> Orchestrator -> agents -> DB / vector / PDF) against a
+# scratch SQLite DB with a stubbed LLM, and reports p50/p95/p99 latency
+# and throughput per stage. LLM calls run in the batch priority class, so
+# a replay against a shared Ollama never delays interactive users.
+#
+# Usage:
+#   python -m benchmarks.replay
+#   python -m benchmarks.replay --rounds 5 --llm-latency 0.05 --output bench.json
+
+from benchmarks import harness
+
+import argparse
+import json
+import time
+
+from utils import metrics
+from utils.llm_scheduler import BATCH
+
+# --------------------------------------------------
+# Built-in corpus (each entry is one conversation)
+# --------------------------------------------------
+
+CONVERSATIONS = [
+    ["hi"],
+    ["what can you do, help"],
+    ["register employee named Rahul", "rahul{n}@example.com, IT"],
+    ["register employee", "Asha, asha{n}@example.com, HR"],
+    ["find employee id 5"],
+    ["find Emp7"],
+    ["set working hours for employee 3 on 2026-03-{day:02d} from 09:00 to 18:00"],
+    ["assign working hours", "4", "2026-04-{day:02d}", "10:00", "19:00"],
+    ["show working hour of 5 on 2026-01-10"],
+    ["attendance info", "6", "2026-01-11"],
+    ["generate daily report for employee 8 on 2026-01-12"],
+    ["daily report", "9"],
+    ["what is the leave policy"],
+    ["tell me about attendance policy"],
+    ["list all hr policies"]
+]
+
+
+def load_requests_corpus(path):
+    """
+    Extra single-turn utterances from a JSONL file (title + body fields).
+    """
+    conversations = []
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                item = json.loads(line)
+                for key in ("utterance", "title", "body"):
+                    if item.get(key):
+                        conversations.append([item[key]])
+    except FileNotFoundError:
+        pass
+
+    return conversations
+
+
+def build_corpus(rounds, extra_path):
+    extra = load_requests_corpus(extra_path) if extra_path else []
+    corpus = []
+
+    for n in range(rounds):
+        for conversation in CONVERSATIONS:
+            corpus.append([turn.format(n=n, day=n % 28 + 1) for turn in conversation])
+        corpus.extend(extra)
+
+    return corpus
+
+
+# --------------------------------------------------
+# Runner
+# --------------------------------------------------
+
+def run(rounds=3, llm_latency=0.0, employees=200, corpus_path="requests.jsonl"):
+    stub = harness.install_stub_llm(latency=llm_latency)
+    harness.seed_database(employees=employees)
+
+    import main
+    from orchestrator import Orchestrator
+
+    orchestrator = Orchestrator()
+
+    timer = harness.StageTimer()
+    harness.instrument_pipeline(timer)
+
+    # Fine-grained spans (encode vs FAISS, per DB function)
+    metrics.enable()
+    metrics.reset()
+
+    corpus = build_corpus(rounds, corpus_path)
+
+    started = time.perf_counter()
+    for i, conversation in enumerate(corpus):
+        session_id = f"replay-{i}"
+        for utterance in conversation:
+            main.process_turn(orchestrator, utterance, session_id, priority=BATCH)
+        orchestrator.reset_state(session_id)
+    wall = time.perf_counter() - started
+
+    stages = {
+        stage: harness.summarize(samples, wall)
+        for stage, samples in sorted(timer.samples.items())
+    }
+
+    return {
+        "conversations": len(corpus),
+        "turns": len(timer.samples.get("turn", [])),
+        "llm_calls": stub.calls,
+        "llm_latency_s": llm_latency,
+        "wall_seconds": round(wall, 3),
+        "stages": stages,
+        "metrics": metrics.snapshot()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay benchmark with per-stage latency.")
+    parser.add_argument("--rounds", type=int, default=3, help="Times to replay the corpus")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Stub LLM latency (s)")
+    parser.add_argument("--employees", type=int, default=200)
+    parser.add_argument("--corpus", default="requests.jsonl", help="Extra JSONL utterances")
+    parser.add_argument("--output", default=None, help="Write results as JSON")
+    args = parser.parse_args()
+
+    results = run(
+        rounds=args.rounds,
+        llm_latency=args.llm_latency,
+        employees=args.employees,
+        corpus_path=args.corpus
+    )
+
+    print(
+        f"Replayed {results['conversations']} conversations / {results['turns']} turns "
+        f"in {results['wall_seconds']}s ({results['llm_calls']} stub LLM calls)"
+    )
+    harness.print_table("Per-stage latency (inclusive)", results["stages"])
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
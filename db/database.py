@@ -3,27 +3,76 @@
 # Uses SQLite only.
 # NO business logic, NO AI logic.
 
+import os
 import sqlite3
+from datetime import datetime
 from pathlib import Path
 
+from utils.audit_log import audited
+from utils.metrics import timed
+
 # --------------------------------------------------
 # Database connection
 # --------------------------------------------------
 
-DB_PATH = Path(__file__).parent / "hr_system.db"
+# HR_DB_PATH lets benchmarks and tools point at a scratch database
+DB_PATH = Path(os.environ.get("HR_DB_PATH", Path(__file__).parent / "hr_system.db"))
+
+# Minutes in a standard working day (WORKING POLICY: 9:00 AM - 6:00 PM).
+# Time beyond this is counted as overtime.
+STANDARD_DAY_MINUTES = 9 * 60
+
+MINUTES_PER_DAY = 24 * 60
+
+# LEAVE POLICY: yearly entitlement in days per leave type
+LEAVE_ENTITLEMENTS = {"casual": 12, "sick": 8}
+
+
+# --------------------------------------------------
+# Time helpers (minutes since midnight)
+# --------------------------------------------------
+
+def time_to_minutes(value):
+    """
+    "HH:MM" -> minutes since midnight.
+    """
+    try:
+        hours, minutes = str(value).strip().split(":")
+        hours, minutes = int(hours), int(minutes)
+    except ValueError:
+        raise ValueError(f"Time '{value}' must be in HH:MM format.")
+
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        raise ValueError(f"Time '{value}' must be in HH:MM format.")
+
+    return hours * 60 + minutes
+
+
+def shift_minutes(start_time, end_time):
+    """
+    (start_minute, end_minute, duration_minutes) for a shift.
+    An end before the start means the shift ends the next day.
+    """
+    start = time_to_minutes(start_time)
+    end = time_to_minutes(end_time)
+
+    return start, end, (end - start) % MINUTES_PER_DAY
 
 
+@timed("db.get_connection")
 def get_connection():
     """
     Create and return a SQLite database connection.
+    URI filenames are enabled so archives can be attached read-only.
     """
-    return sqlite3.connect(DB_PATH)
+    return sqlite3.connect(DB_PATH, uri=True)
 
 
 # --------------------------------------------------
 # Table creation
 # --------------------------------------------------
 
+@timed("db.create_tables")
 def create_tables():
     """
     Create required tables if they do not already exist.
@@ -41,6 +90,14 @@ def create_tables():
         )
     """)
 
+    # Directory listing by department: index entries carry the rowid
+    # (employee_id), so "department = ? AND employee_id > ?" in id order
+    # is a single index range scan
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_employees_department
+        ON employees (department)
+    """)
+
     # Attendance table (HR-assigned working hours)
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS attendance (
@@ -49,18 +106,171 @@ def create_tables():
             date TEXT NOT NULL,
             start_time TEXT NOT NULL,
             end_time TEXT NOT NULL,
+            start_minute INTEGER,
+            end_minute INTEGER,
+            duration_minutes INTEGER,
+            FOREIGN KEY (employee_id) REFERENCES employees(employee_id)
+        )
+    """)
+
+    # Databases created before the minute columns existed
+    _migrate_minute_columns(cursor, "attendance")
+
+    # Range scans (exports, reports) filter attendance by date
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_attendance_date
+        ON attendance (date)
+    """)
+
+    # Point lookups and conflict checks by employee + date
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_attendance_employee_date
+        ON attendance (employee_id, date)
+    """)
+
+    # Closed years whose attendance moved to a read-only archive file
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS attendance_partitions (
+            year INTEGER PRIMARY KEY,
+            rows INTEGER NOT NULL,
+            archived_at TEXT NOT NULL
+        )
+    """)
+
+    # Recurring shift templates (weekly pattern per employee OR department)
+    # weekday: 0 = Monday ... 6 = Sunday; valid_to NULL = open-ended
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS shift_templates (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            employee_id INTEGER,
+            department TEXT,
+            weekday INTEGER NOT NULL CHECK (weekday BETWEEN 0 AND 6),
+            start_time TEXT NOT NULL,
+            end_time TEXT NOT NULL,
+            start_minute INTEGER,
+            end_minute INTEGER,
+            duration_minutes INTEGER,
+            valid_from TEXT NOT NULL,
+            valid_to TEXT,
+            CHECK ((employee_id IS NULL) <> (department IS NULL)),
+            FOREIGN KEY (employee_id) REFERENCES employees(employee_id)
+        )
+    """)
+
+    _migrate_minute_columns(cursor, "shift_templates")
+
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_shift_templates_employee
+        ON shift_templates (employee_id, weekday)
+    """)
+
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_shift_templates_department
+        ON shift_templates (department, weekday)
+    """)
+
+    # Monthly totals of assigned attendance, maintained on every write
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS attendance_monthly_summary (
+            employee_id INTEGER NOT NULL,
+            month TEXT NOT NULL,
+            days INTEGER NOT NULL,
+            total_minutes INTEGER NOT NULL,
+            overtime_minutes INTEGER NOT NULL,
+            PRIMARY KEY (employee_id, month)
+        )
+    """)
+
+    # Backfill the summary once for databases created before it existed
+    cursor.execute("SELECT 1 FROM attendance_monthly_summary LIMIT 1")
+    if cursor.fetchone() is None:
+        _rebuild_monthly_summary(cursor)
+
+    # Leave requests (one row per request, days = leave days it consumes)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS leave_requests (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            employee_id INTEGER NOT NULL,
+            leave_type TEXT NOT NULL,
+            start_date TEXT NOT NULL,
+            end_date TEXT NOT NULL,
+            days INTEGER NOT NULL,
             FOREIGN KEY (employee_id) REFERENCES employees(employee_id)
         )
     """)
 
+    # Overlap checks by employee + period
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_leave_requests_employee_start
+        ON leave_requests (employee_id, start_date)
+    """)
+
+    # Leave days used per employee, year and type, maintained on every write
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS leave_balances (
+            employee_id INTEGER NOT NULL,
+            year TEXT NOT NULL,
+            leave_type TEXT NOT NULL,
+            used_days INTEGER NOT NULL,
+            PRIMARY KEY (employee_id, year, leave_type)
+        )
+    """)
+
     conn.commit()
     conn.close()
 
 
+def _migrate_minute_columns(cursor, table):
+    """
+    Add start_minute / end_minute / duration_minutes to an existing
+    table and fill them from the "HH:MM" text columns.
+    """
+    cursor.execute(f"PRAGMA table_info({table})")
+    columns = {r[1] for r in cursor.fetchall()}
+
+    missing = [
+        c for c in ["start_minute", "end_minute", "duration_minutes"]
+        if c not in columns
+    ]
+    if not missing:
+        return
+
+    for column in missing:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} INTEGER")
+
+    # Legacy rows hold whatever text was entered ("9:30", "9am"), so
+    # parse each one; rows that do not parse keep NULL minutes and are
+    # ignored by every working-hours query until they are re-entered
+    cursor.execute(f"SELECT id, start_time, end_time FROM {table}")
+
+    updates, skipped = [], []
+    for row_id, start_time, end_time in cursor.fetchall():
+        try:
+            updates.append((*shift_minutes(start_time, end_time), row_id))
+        except ValueError:
+            skipped.append(row_id)
+
+    cursor.executemany(f"""
+        UPDATE {table}
+        SET start_minute = ?, end_minute = ?, duration_minutes = ?
+        WHERE id = ?
+    """, updates)
+
+    if skipped:
+        shown = ", ".join(map(str, skipped[:20]))
+        more = f" (+{len(skipped) - 20} more)" if len(skipped) > 20 else ""
+        print(
+            f"⚠️ {table}: {len(skipped)} row(s) with times not in HH:MM format "
+            f"skipped (ignored until re-entered), ids {shown}{more}"
+        )
+
+
 # --------------------------------------------------
 # Employee-related DB functions
 # --------------------------------------------------
 
+@timed("db.add_employee")
+@audited("add_employee")
 def add_employee(name, email, department):
     """
     Insert a new employee.
@@ -81,6 +291,7 @@ def add_employee(name, email, department):
     return employee_id
 
 
+@timed("db.employee_exists")
 def employee_exists(email):
     """
     Check if an employee exists using email.
@@ -98,6 +309,7 @@ def employee_exists(email):
     return exists
 
 
+@timed("db.get_employee_by_id")
 def get_employee_by_id(employee_id):
     """
     Fetch employee by ID.
@@ -125,6 +337,7 @@ def get_employee_by_id(employee_id):
     }
 
 
+@timed("db.get_employee_by_name")
 def get_employee_by_name(name):
     """
     Fetch employees by name.
@@ -152,10 +365,354 @@ def get_employee_by_name(name):
     ]
 
 
+@timed("db.get_employees_after")
+def get_employees_after(last_id=0):
+    """
+    All employees with an id greater than last_id, in id order
+    (full load when last_id is 0, catch-up for in-memory indexes).
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute("""
+        SELECT employee_id, name, email, department
+        FROM employees
+        WHERE employee_id > ?
+        ORDER BY employee_id
+    """, (last_id,))
+
+    rows = cursor.fetchall()
+    conn.close()
+
+    return [
+        {
+            "employee_id": r[0],
+            "name": r[1],
+            "email": r[2],
+            "department": r[3]
+        }
+        for r in rows
+    ]
+
+
+@timed("db.get_employee_page")
+def get_employee_page(department=None, after_id=0, limit=50):
+    """
+    One directory page: at most limit employees with an id greater
+    than after_id (optionally in one department), in id order.
+    Keyset pagination: pass the last id of a page to get the next one,
+    so deep pages cost the same as the first.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    if department:
+        cursor.execute("""
+            SELECT employee_id, name, email, department
+            FROM employees
+            WHERE department = ? AND employee_id > ?
+            ORDER BY employee_id
+            LIMIT ?
+        """, (department.upper(), after_id, limit))
+    else:
+        cursor.execute("""
+            SELECT employee_id, name, email, department
+            FROM employees
+            WHERE employee_id > ?
+            ORDER BY employee_id
+            LIMIT ?
+        """, (after_id, limit))
+
+    rows = cursor.fetchall()
+    conn.close()
+
+    return [
+        {
+            "employee_id": r[0],
+            "name": r[1],
+            "email": r[2],
+            "department": r[3]
+        }
+        for r in rows
+    ]
+
+
+def iter_employee_pages(department=None, page_size=1000):
+    """
+    Stream the whole directory (or one department) page by page.
+    Each page is its own short query, so no read transaction is held
+    while the caller writes the rows out.
+    """
+    after_id = 0
+
+    while True:
+        page = get_employee_page(department, after_id, page_size)
+        if not page:
+            break
+
+        yield page
+
+        if len(page) < page_size:
+            break
+        after_id = page[-1]["employee_id"]
+
+
+# --------------------------------------------------
+# Attendance partitions (one read-only archive per closed year)
+# --------------------------------------------------
+
+# The live attendance table holds recent years; archived years live in
+# their own compacted SQLite file next to the main database and are
+# attached read-only to the connections whose date range needs them.
+
+ATTENDANCE_COLUMNS = (
+    "employee_id, date, start_time, end_time, "
+    "start_minute, end_minute, duration_minutes"
+)
+
+# SQLite attaches at most 10 databases per connection
+MAX_ATTACHED_ARCHIVES = 9
+
+
+def archive_path(year):
+    """
+    Archive file of a year, named after the main database
+    (so scratch databases keep their own archives).
+    """
+    db_path = Path(DB_PATH)
+    return db_path.parent / f"{db_path.stem}_attendance_{int(year)}.db"
+
+
+def _archived_years(cursor, start_date=None, end_date=None):
+    """
+    Archived years overlapping [start_date, end_date] (open-ended when None).
+    """
+    cursor.execute("""
+        SELECT year FROM attendance_partitions
+        WHERE year BETWEEN ? AND ?
+        ORDER BY year
+    """, (
+        int(start_date[:4]) if start_date else 0,
+        int(end_date[:4]) if end_date else 9999
+    ))
+
+    return [r[0] for r in cursor.fetchall()]
+
+
+def _archive_uri(year):
+    """
+    Read-only URI of a year's archive. Archives never change once
+    written, so they are opened immutable (no file locking).
+    """
+    return archive_path(year).resolve().as_uri() + "?mode=ro&immutable=1"
+
+
+def _attach_archive(cursor, year):
+    """
+    Attach a year's archive read-only. Returns the schema name.
+    """
+    schema = f"attendance_{year}"
+    cursor.execute(f"ATTACH DATABASE ? AS {schema}", (_archive_uri(year),))
+    return schema
+
+
+def _attendance_source(cursor, start_date=None, end_date=None):
+    """
+    Table expression for attendance rows in [start_date, end_date]:
+    the live table alone when no archived year overlaps the range
+    (recent data never touches the archives), otherwise the live table
+    and the overlapping archives as one UNION ALL. SQLite pushes outer
+    filters into each branch, so every partition is searched by index.
+    """
+    years = _archived_years(cursor, start_date, end_date)
+    if not years:
+        return "attendance"
+
+    if len(years) > MAX_ATTACHED_ARCHIVES:
+        raise ValueError(
+            f"A query can span at most {MAX_ATTACHED_ARCHIVES} archived years; "
+            "please split the period."
+        )
+
+    branches = [f"SELECT {ATTENDANCE_COLUMNS} FROM main.attendance"]
+    for year in years:
+        schema = _attach_archive(cursor, year)
+        branches.append(f"SELECT {ATTENDANCE_COLUMNS} FROM {schema}.attendance")
+
+    return "(" + " UNION ALL ".join(branches) + ")"
+
+
+def _attendance_table(cursor, date):
+    """
+    Table holding attendance for one date: its year's archive,
+    or the live table.
+    """
+    # No usable date (e.g. a report without one): never an archive,
+    # and None must not become the open range of _archived_years
+    if not date or not str(date)[:4].isdigit():
+        return "attendance"
+
+    year = int(str(date)[:4])
+    if _archived_years(cursor, f"{year:04d}", f"{year:04d}"):
+        return f"{_attach_archive(cursor, year)}.attendance"
+    return "attendance"
+
+
+def _check_not_archived(cursor, dates):
+    """
+    Archives are read-only: refuse writes for archived years.
+    """
+    years = {int(date[:4]) for date in dates}
+    archived = [y for y in _archived_years(cursor, min(dates), max(dates)) if y in years]
+
+    if archived:
+        raise ValueError(
+            f"Attendance for {', '.join(map(str, archived))} is archived and read-only."
+        )
+
+
+@timed("db.get_attendance_partitions")
+def get_attendance_partitions():
+    """
+    Years present in the live table and archived years (with row counts).
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute("""
+        SELECT DISTINCT CAST(substr(date, 1, 4) AS INTEGER)
+        FROM attendance
+        ORDER BY 1
+    """)
+    live_years = [r[0] for r in cursor.fetchall()]
+
+    cursor.execute("""
+        SELECT year, rows, archived_at
+        FROM attendance_partitions
+        ORDER BY year
+    """)
+    archived = [
+        {"year": r[0], "rows": r[1], "archived_at": r[2], "file_path": str(archive_path(r[0]))}
+        for r in cursor.fetchall()
+    ]
+
+    conn.close()
+
+    return {"live_years": live_years, "archived": archived}
+
+
+@timed("db.archive_attendance_year")
+@audited("archive_attendance_year")
+def archive_attendance_year(year, batch_size=10000):
+    """
+    Move a past year's attendance rows out of the live table into
+    their own compacted, read-only SQLite file.
+    Writers are blocked while the year is copied; readers keep using
+    the live rows until the move commits, then read the archive.
+    Returns a summary dict.
+    """
+    year = int(year)
+    if year >= datetime.now().year:
+        raise ValueError("Only past years can be archived.")
+
+    start_date, end_date = f"{year:04d}-01-01", f"{year:04d}-12-31"
+    path = archive_path(year)
+    tmp_path = path.with_name(path.name + ".tmp")
+
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    try:
+        # Write lock first: no attendance for the year may be added meanwhile
+        cursor.execute("BEGIN IMMEDIATE")
+
+        if _archived_years(cursor, start_date, end_date):
+            raise ValueError(f"Attendance for {year} is already archived.")
+
+        # 1. Copy the year into a fresh file (streamed in batches)
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+        archive = sqlite3.connect(tmp_path)
+        try:
+            archive.execute("""
+                CREATE TABLE attendance (
+                    employee_id INTEGER NOT NULL,
+                    date TEXT NOT NULL,
+                    start_time TEXT NOT NULL,
+                    end_time TEXT NOT NULL,
+                    start_minute INTEGER,
+                    end_minute INTEGER,
+                    duration_minutes INTEGER
+                )
+            """)
+
+            cursor.execute(f"""
+                SELECT {ATTENDANCE_COLUMNS}
+                FROM attendance
+                WHERE date BETWEEN ? AND ?
+                ORDER BY date, employee_id
+            """, (start_date, end_date))
+
+            row_count = 0
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                archive.executemany(
+                    f"INSERT INTO attendance ({ATTENDANCE_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                row_count += len(rows)
+
+            # Same access paths as the live table, built once after loading
+            archive.execute("CREATE INDEX idx_attendance_date ON attendance (date)")
+            archive.execute(
+                "CREATE INDEX idx_attendance_employee_date ON attendance (employee_id, date)"
+            )
+            archive.commit()
+
+            # 2. Compact: rewrite the file without free pages
+            archive.execute("VACUUM")
+        finally:
+            archive.close()
+
+        # 3. Seal: read-only on disk, then publish under the final name
+        os.chmod(tmp_path, 0o444)
+        os.replace(tmp_path, path)
+
+        # 4. Drop the rows from the live table and register the archive
+        cursor.execute("""
+            DELETE FROM attendance
+            WHERE date BETWEEN ? AND ?
+        """, (start_date, end_date))
+
+        cursor.execute("""
+            INSERT INTO attendance_partitions (year, rows, archived_at)
+            VALUES (?, ?, ?)
+        """, (year, row_count, datetime.now().isoformat(timespec="seconds")))
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        if tmp_path.exists():
+            tmp_path.unlink()
+        raise
+    finally:
+        conn.close()
+
+    return {
+        "year": year,
+        "rows": row_count,
+        "file_path": str(path)
+    }
+
+
 # --------------------------------------------------
 # Attendance-related DB functions (HR-driven)
 # --------------------------------------------------
 
+@timed("db.attendance_exists")
 def attendance_exists(employee_id, date):
     """
     Check if attendance already exists for employee on a date.
@@ -163,8 +720,9 @@ def attendance_exists(employee_id, date):
     conn = get_connection()
     cursor = conn.cursor()
 
-    cursor.execute("""
-        SELECT 1 FROM attendance
+    table = _attendance_table(cursor, date)
+    cursor.execute(f"""
+        SELECT 1 FROM {table}
         WHERE employee_id = ? AND date = ?
     """, (employee_id, date))
 
@@ -174,37 +732,153 @@ def attendance_exists(employee_id, date):
     return exists
 
 
+@timed("db.assign_working_hours")
+@audited("assign_working_hours")
 def assign_working_hours(employee_id, date, start_time, end_time):
     """
     Assign working hours for an employee on a given date.
     One record per employee per date.
     """
+    start_minute, end_minute, duration = shift_minutes(start_time, end_time)
+
     conn = get_connection()
     cursor = conn.cursor()
 
-    cursor.execute("""
-        INSERT INTO attendance (employee_id, date, start_time, end_time)
-        VALUES (?, ?, ?, ?)
-    """, (employee_id, date, start_time, end_time))
+    try:
+        _check_not_archived(cursor, [date])
 
-    conn.commit()
-    conn.close()
+        cursor.execute("""
+            INSERT INTO attendance
+                (employee_id, date, start_time, end_time,
+                 start_minute, end_minute, duration_minutes)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (employee_id, date, start_time, end_time, start_minute, end_minute, duration))
 
+        _update_monthly_summary(cursor, [(employee_id, date, duration)])
 
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+@timed("db.bulk_assign_working_hours")
+@audited("bulk_assign_working_hours")
+def bulk_assign_working_hours(department, dates, start_time, end_time):
+    """
+    Assign the same working hours to every employee of a department
+    on each of the given dates, in one transaction.
+    Existing (employee, date) rows are skipped, not overwritten.
+    Returns a summary dict.
+    """
+    dates = sorted(set(dates))
+    start_minute, end_minute, duration = shift_minutes(start_time, end_time)
+
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("""
+            SELECT employee_id FROM employees
+            WHERE department = ?
+            ORDER BY employee_id
+        """, (department.upper(),))
+        employee_ids = [r[0] for r in cursor.fetchall()]
+
+        if not employee_ids or not dates:
+            return {
+                "employees": len(employee_ids),
+                "inserted": 0,
+                "conflicts": []
+            }
+
+        _check_not_archived(cursor, dates)
+
+        # All existing rows for the department and period in one query
+        cursor.execute("""
+            SELECT a.employee_id, a.date
+            FROM attendance a
+            JOIN employees e ON e.employee_id = a.employee_id
+            WHERE e.department = ? AND a.date BETWEEN ? AND ?
+        """, (department.upper(), dates[0], dates[-1]))
+
+        date_set = set(dates)
+        conflicts = sorted(r for r in cursor.fetchall() if r[1] in date_set)
+        conflict_set = set(conflicts)
+
+        rows = [
+            (employee_id, date, start_time, end_time, start_minute, end_minute, duration)
+            for employee_id in employee_ids
+            for date in dates
+            if (employee_id, date) not in conflict_set
+        ]
+
+        cursor.executemany("""
+            INSERT INTO attendance
+                (employee_id, date, start_time, end_time,
+                 start_minute, end_minute, duration_minutes)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+
+        _update_monthly_summary(cursor, [(r[0], r[1], duration) for r in rows])
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    return {
+        "employees": len(employee_ids),
+        "inserted": len(rows),
+        "conflicts": conflicts
+    }
+
+
+@timed("db.get_working_hours")
 def get_working_hours(employee_id, date):
     """
     Get working hours for an employee on a specific date.
+    An explicitly assigned row wins; otherwise the employee's shift
+    template applies, then the department's.
     """
     conn = get_connection()
     cursor = conn.cursor()
 
-    cursor.execute("""
-        SELECT start_time, end_time
-        FROM attendance
-        WHERE employee_id = ? AND date = ?
+    table = _attendance_table(cursor, date)
+    cursor.execute(f"""
+        SELECT start_time, end_time, duration_minutes
+        FROM {table}
+        WHERE employee_id = ? AND date = ? AND duration_minutes IS NOT NULL
     """, (employee_id, date))
 
     row = cursor.fetchone()
+    source = "assigned"
+
+    if not row:
+        cursor.execute("""
+            SELECT t.start_time, t.end_time, t.duration_minutes
+            FROM shift_templates t
+            WHERE t.weekday = (CAST(strftime('%w', :date) AS INTEGER) + 6) % 7
+              AND t.duration_minutes IS NOT NULL
+              AND t.valid_from <= :date
+              AND (t.valid_to IS NULL OR t.valid_to >= :date)
+              AND (
+                  t.employee_id = :employee_id
+                  OR t.department = (
+                      SELECT department FROM employees WHERE employee_id = :employee_id
+                  )
+              )
+            ORDER BY t.employee_id IS NULL, t.valid_from DESC, t.id DESC
+            LIMIT 1
+        """, {"employee_id": employee_id, "date": date})
+
+        row = cursor.fetchone()
+        source = "template"
+
     conn.close()
 
     if not row:
@@ -212,10 +886,582 @@ def get_working_hours(employee_id, date):
 
     return {
         "start_time": row[0],
-        "end_time": row[1]
+        "end_time": row[1],
+        "duration_minutes": row[2],
+        "source": source
+    }
+
+
+# --------------------------------------------------
+# Shift templates (expanded lazily at query time)
+# --------------------------------------------------
+
+# Effective working hours per employee and day in [:start_date, :end_date]:
+# explicit attendance rows, plus template days that have no explicit row.
+# Employee templates beat department templates; newer valid_from wins.
+# Legacy rows whose times never parsed (NULL minutes) are left out.
+# {employee_filter} is an extra condition on employees e; {attendance}
+# is the attendance source for the period (see _attendance_source).
+EFFECTIVE_ATTENDANCE_CTE = """
+    WITH RECURSIVE days(d) AS (
+        SELECT :start_date
+        UNION ALL
+        SELECT date(d, '+1 day') FROM days WHERE d < :end_date
+    ),
+    template_days AS (
+        SELECT days.d AS date, t.id, t.employee_id AS template_employee,
+               t.department, t.start_time, t.end_time, t.start_minute,
+               t.end_minute, t.duration_minutes, t.valid_from
+        FROM days
+        JOIN shift_templates t
+          ON t.weekday = (CAST(strftime('%w', days.d) AS INTEGER) + 6) % 7
+         AND t.valid_from <= days.d
+         AND (t.valid_to IS NULL OR t.valid_to >= days.d)
+         AND t.duration_minutes IS NOT NULL
+    ),
+    candidates AS (
+        SELECT e.employee_id, td.date, td.start_time, td.end_time,
+               td.start_minute, td.end_minute, td.duration_minutes,
+               ROW_NUMBER() OVER (
+                   PARTITION BY e.employee_id, td.date
+                   ORDER BY td.template_employee IS NULL, td.valid_from DESC, td.id DESC
+               ) AS rn
+        FROM template_days td
+        JOIN employees e
+          ON (td.template_employee = e.employee_id)
+          OR (td.template_employee IS NULL AND td.department = e.department)
+        WHERE {employee_filter}
+    ),
+    effective AS (
+        SELECT a.employee_id, a.date, a.start_time, a.end_time,
+               a.start_minute, a.end_minute, a.duration_minutes, 'assigned' AS source
+        FROM {attendance} a
+        JOIN employees e ON e.employee_id = a.employee_id
+        WHERE a.date BETWEEN :start_date AND :end_date
+          AND a.duration_minutes IS NOT NULL AND {employee_filter}
+        UNION ALL
+        SELECT c.employee_id, c.date, c.start_time, c.end_time,
+               c.start_minute, c.end_minute, c.duration_minutes, 'template' AS source
+        FROM candidates c
+        WHERE c.rn = 1
+          AND NOT EXISTS (
+              SELECT 1 FROM {attendance} a
+              WHERE a.employee_id = c.employee_id AND a.date = c.date
+                AND a.duration_minutes IS NOT NULL
+          )
+    )
+"""
+
+
+def _effective_filter(employee_id=None, department=None):
+    """
+    Build the {employee_filter} condition and its parameters.
+    """
+    conditions = ["1 = 1"]
+    params = {}
+
+    if employee_id is not None:
+        conditions.append("e.employee_id = :employee_id")
+        params["employee_id"] = employee_id
+
+    if department:
+        conditions.append("e.department = :department")
+        params["department"] = department.upper()
+
+    return " AND ".join(conditions), params
+
+
+@timed("db.add_shift_template")
+@audited("add_shift_template")
+def add_shift_template(weekdays, start_time, end_time, valid_from, valid_to=None,
+                       employee_id=None, department=None):
+    """
+    Store a weekly shift pattern for one employee OR one department.
+    One row per weekday; nothing is expanded per day.
+    Returns the number of template rows stored.
+    """
+    if (employee_id is None) == (not department):
+        raise ValueError("Provide either employee_id or department.")
+
+    start_minute, end_minute, duration = shift_minutes(start_time, end_time)
+
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.executemany("""
+        INSERT INTO shift_templates
+            (employee_id, department, weekday, start_time, end_time,
+             start_minute, end_minute, duration_minutes, valid_from, valid_to)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, [
+        (
+            employee_id,
+            department.upper() if department else None,
+            weekday, start_time, end_time,
+            start_minute, end_minute, duration,
+            valid_from, valid_to
+        )
+        for weekday in sorted(set(weekdays))
+    ])
+
+    count = cursor.rowcount
+    conn.commit()
+    conn.close()
+
+    return count
+
+
+@timed("db.get_working_hours_range")
+def get_working_hours_range(employee_id, start_date, end_date):
+    """
+    Effective working hours for an employee over a date range,
+    with shift templates expanded and explicit rows as overrides.
+    """
+    employee_filter, params = _effective_filter(employee_id=employee_id)
+
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    attendance = _attendance_source(cursor, start_date, end_date)
+    cursor.execute(
+        EFFECTIVE_ATTENDANCE_CTE.format(employee_filter=employee_filter, attendance=attendance) + """
+        SELECT date, start_time, end_time, duration_minutes, source
+        FROM effective
+        ORDER BY date
+        """,
+        {**params, "start_date": start_date, "end_date": end_date}
+    )
+
+    rows = cursor.fetchall()
+    conn.close()
+
+    return [
+        {
+            "date": r[0],
+            "start_time": r[1],
+            "end_time": r[2],
+            "duration_minutes": r[3],
+            "source": r[4]
+        }
+        for r in rows
+    ]
+
+
+# --------------------------------------------------
+# Aggregation (set-based, over effective attendance)
+# --------------------------------------------------
+
+def _update_monthly_summary(cursor, rows):
+    """
+    Add (employee_id, date, duration_minutes) rows to the monthly
+    summary. Runs inside the caller's transaction.
+    """
+    totals = {}
+
+    for employee_id, date, minutes in rows:
+        key = (employee_id, date[:7])
+        days, total, overtime = totals.get(key, (0, 0, 0))
+        totals[key] = (
+            days + 1,
+            total + minutes,
+            overtime + max(minutes - STANDARD_DAY_MINUTES, 0)
+        )
+
+    cursor.executemany("""
+        INSERT INTO attendance_monthly_summary
+            (employee_id, month, days, total_minutes, overtime_minutes)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (employee_id, month) DO UPDATE SET
+            days = days + excluded.days,
+            total_minutes = total_minutes + excluded.total_minutes,
+            overtime_minutes = overtime_minutes + excluded.overtime_minutes
+    """, [(k[0], k[1], *v) for k, v in totals.items()])
+
+
+def _rebuild_monthly_summary(cursor):
+    """
+    Recompute the monthly summary from all attendance rows
+    (live table and archives; a month never spans partitions).
+    """
+    aggregate = """
+        SELECT a.employee_id, substr(a.date, 1, 7), COUNT(*),
+               SUM(a.duration_minutes),
+               SUM(MAX(a.duration_minutes - ?, 0))
+        FROM attendance a
+        WHERE a.duration_minutes IS NOT NULL
+        GROUP BY a.employee_id, substr(a.date, 1, 7)
+    """
+
+    # Archives are read through their own connections: nothing can be
+    # attached once this transaction has started
+    archived_rows = []
+    for year in _archived_years(cursor):
+        archive = sqlite3.connect(_archive_uri(year), uri=True)
+        try:
+            archived_rows += archive.execute(aggregate, (STANDARD_DAY_MINUTES,)).fetchall()
+        finally:
+            archive.close()
+
+    cursor.execute("DELETE FROM attendance_monthly_summary")
+    cursor.execute("""
+        INSERT INTO attendance_monthly_summary
+            (employee_id, month, days, total_minutes, overtime_minutes)
+    """ + aggregate, (STANDARD_DAY_MINUTES,))
+    cursor.executemany("""
+        INSERT INTO attendance_monthly_summary
+            (employee_id, month, days, total_minutes, overtime_minutes)
+        VALUES (?, ?, ?, ?, ?)
+    """, archived_rows)
+
+
+@timed("db.rebuild_monthly_summary")
+def rebuild_monthly_summary():
+    """
+    Recompute the precomputed monthly summary (e.g. after manual edits).
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    _rebuild_monthly_summary(cursor)
+
+    conn.commit()
+    conn.close()
+
+
+SUMMARY_GROUPS = {
+    "employee": ["e.employee_id", "e.name", "e.department"],
+    "department": ["e.department"]
+}
+
+
+@timed("db.get_hours_summary")
+def get_hours_summary(start_date, end_date, group_by="employee", by_month=False,
+                      employee_id=None, department=None):
+    """
+    Total / average / overtime hours per employee or department over a period.
+    Computed in one SQL query over effective attendance (assigned rows +
+    shift templates). Optionally split per month.
+    """
+    if group_by not in SUMMARY_GROUPS:
+        raise ValueError(f"group_by must be one of: {', '.join(SUMMARY_GROUPS)}")
+
+    employee_filter, params = _effective_filter(employee_id=employee_id, department=department)
+
+    group_cols = list(SUMMARY_GROUPS[group_by])
+    if by_month:
+        group_cols.append("substr(f.date, 1, 7)")
+
+    select_cols = ", ".join(group_cols)
+
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    attendance = _attendance_source(cursor, start_date, end_date)
+    query = EFFECTIVE_ATTENDANCE_CTE.format(employee_filter=employee_filter, attendance=attendance) + f"""
+        SELECT {select_cols},
+               COUNT(*) AS days,
+               COUNT(DISTINCT f.employee_id) AS employees,
+               SUM(f.duration_minutes) AS total_minutes,
+               SUM(MAX(f.duration_minutes - :standard_minutes, 0)) AS overtime_minutes
+        FROM effective f
+        JOIN employees e ON e.employee_id = f.employee_id
+        GROUP BY {select_cols}
+        ORDER BY {select_cols}
+    """
+    params.update({
+        "start_date": start_date,
+        "end_date": end_date,
+        "standard_minutes": STANDARD_DAY_MINUTES
+    })
+
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+    conn.close()
+
+    key_names = [c.split(".")[-1] for c in SUMMARY_GROUPS[group_by]]
+    if by_month:
+        key_names.append("month")
+
+    results = []
+    for r in rows:
+        keys = dict(zip(key_names, r[:len(key_names)]))
+        days, employees, total, overtime = r[len(key_names):]
+
+        results.append({
+            **keys,
+            "days": days,
+            "employees": employees,
+            "total_hours": round(total / 60, 2),
+            "average_hours": round(total / days / 60, 2) if days else 0.0,
+            "overtime_hours": round(overtime / 60, 2)
+        })
+
+    return results
+
+
+@timed("db.get_monthly_summary")
+def get_monthly_summary(month, department=None):
+    """
+    Read precomputed monthly totals ("YYYY-MM") of assigned attendance.
+    Constant-cost read for dashboards; shift-template days are not
+    included (use get_hours_summary for those).
+    """
+    query = """
+        SELECT s.employee_id, e.name, e.department,
+               s.days, s.total_minutes, s.overtime_minutes
+        FROM attendance_monthly_summary s
+        JOIN employees e ON e.employee_id = s.employee_id
+        WHERE s.month = ?
+    """
+    params = [month]
+
+    if department:
+        query += " AND e.department = ?"
+        params.append(department.upper())
+
+    query += " ORDER BY s.employee_id"
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+    conn.close()
+
+    return [
+        {
+            "employee_id": r[0],
+            "name": r[1],
+            "department": r[2],
+            "month": month,
+            "days": r[3],
+            "total_hours": round(r[4] / 60, 2),
+            "average_hours": round(r[4] / r[3] / 60, 2) if r[3] else 0.0,
+            "overtime_hours": round(r[5] / 60, 2)
+        }
+        for r in rows
+    ]
+
+
+@timed("db.get_effective_attendance")
+def get_effective_attendance(start_date, end_date, employee_id=None, department=None):
+    """
+    Effective attendance for a period as columns (dict of lists), ready
+    to be loaded into arrays: employee_id, name, department, date,
+    weekday (0 = Monday), start_minute, end_minute, duration_minutes.
+    """
+    employee_filter, params = _effective_filter(employee_id=employee_id, department=department)
+
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    attendance = _attendance_source(cursor, start_date, end_date)
+    cursor.execute(
+        EFFECTIVE_ATTENDANCE_CTE.format(employee_filter=employee_filter, attendance=attendance) + """
+        SELECT f.employee_id, e.name, e.department, f.date,
+               (CAST(strftime('%w', f.date) AS INTEGER) + 6) % 7,
+               f.start_minute, f.end_minute, f.duration_minutes
+        FROM effective f
+        JOIN employees e ON e.employee_id = f.employee_id
+        ORDER BY f.date, f.employee_id
+        """,
+        {**params, "start_date": start_date, "end_date": end_date}
+    )
+
+    rows = cursor.fetchall()
+    conn.close()
+
+    names = [
+        "employee_id", "name", "department", "date",
+        "weekday", "start_minute", "end_minute", "duration_minutes"
+    ]
+
+    if not rows:
+        return {name: [] for name in names}
+
+    return dict(zip(names, (list(col) for col in zip(*rows))))
+
+
+# --------------------------------------------------
+# Leave-related DB functions
+# --------------------------------------------------
+
+@timed("db.apply_leave")
+@audited("apply_leave")
+def apply_leave(employee_id, leave_type, dates):
+    """
+    Record a leave request covering the given leave dates and add them
+    to the employee's yearly balance, in one transaction.
+    Returns a dict with status success / overlap / insufficient.
+    """
+    dates = sorted(set(dates))
+    entitlement = LEAVE_ENTITLEMENTS[leave_type]
+
+    days_per_year = {}
+    for date in dates:
+        days_per_year[date[:4]] = days_per_year.get(date[:4], 0) + 1
+
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    try:
+        # Write lock before the overlap check, so a concurrent request
+        # cannot pass the same check before this one commits
+        cursor.execute("BEGIN IMMEDIATE")
+
+        cursor.execute("""
+            SELECT start_date, end_date FROM leave_requests
+            WHERE employee_id = ? AND start_date <= ? AND end_date >= ?
+        """, (employee_id, dates[-1], dates[0]))
+        conflicts = cursor.fetchall()
+
+        if conflicts:
+            conn.rollback()
+            return {"status": "overlap", "conflicts": conflicts}
+
+        for year, days in days_per_year.items():
+            # Only adds the days while they still fit the entitlement
+            cursor.execute("""
+                INSERT INTO leave_balances (employee_id, year, leave_type, used_days)
+                SELECT ?, ?, ?, ? WHERE ? <= ?
+                ON CONFLICT (employee_id, year, leave_type) DO UPDATE SET
+                    used_days = used_days + excluded.used_days
+                WHERE used_days + excluded.used_days <= ?
+            """, (employee_id, year, leave_type, days, days, entitlement, entitlement))
+
+            if cursor.rowcount == 0:
+                conn.rollback()
+                cursor.execute("""
+                    SELECT used_days FROM leave_balances
+                    WHERE employee_id = ? AND year = ? AND leave_type = ?
+                """, (employee_id, year, leave_type))
+                row = cursor.fetchone()
+                return {
+                    "status": "insufficient",
+                    "year": year,
+                    "requested": days,
+                    "remaining": entitlement - (row[0] if row else 0)
+                }
+
+        cursor.execute("""
+            INSERT INTO leave_requests
+                (employee_id, leave_type, start_date, end_date, days)
+            VALUES (?, ?, ?, ?, ?)
+        """, (employee_id, leave_type, dates[0], dates[-1], len(dates)))
+        request_id = cursor.lastrowid
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    return {
+        "status": "success",
+        "request_id": request_id,
+        "days": len(dates)
     }
 
 
+@timed("db.get_leave_balance")
+def get_leave_balance(employee_id, year):
+    """
+    Entitled / used / remaining leave days per type for one year,
+    read from the maintained counters (no history scan).
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute("""
+        SELECT leave_type, used_days FROM leave_balances
+        WHERE employee_id = ? AND year = ?
+    """, (employee_id, str(year)))
+
+    used = dict(cursor.fetchall())
+    conn.close()
+
+    return {
+        leave_type: {
+            "entitled": entitled,
+            "used": used.get(leave_type, 0),
+            "remaining": entitled - used.get(leave_type, 0)
+        }
+        for leave_type, entitled in LEAVE_ENTITLEMENTS.items()
+    }
+
+
+# --------------------------------------------------
+# Export-related DB functions (streaming)
+# --------------------------------------------------
+
+@timed("db.get_departments")
+def get_departments():
+    """
+    Fetch all distinct departments.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute("""
+        SELECT DISTINCT department
+        FROM employees
+        ORDER BY department
+    """)
+
+    rows = cursor.fetchall()
+    conn.close()
+
+    return [r[0] for r in rows]
+
+
+@timed("db.iter_attendance_with_employees")
+def iter_attendance_with_employees(start_date, end_date, department=None, batch_size=1000):
+    """
+    Stream effective attendance (assigned rows + shift templates)
+    joined with employee details for a date range.
+    Yields lists of at most batch_size rows, so the full result
+    is never held in memory.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    employee_filter, params = _effective_filter(department=department)
+    params.update({"start_date": start_date, "end_date": end_date})
+
+    try:
+        attendance = _attendance_source(cursor, start_date, end_date)
+        query = EFFECTIVE_ATTENDANCE_CTE.format(employee_filter=employee_filter, attendance=attendance) + """
+            SELECT f.employee_id, e.name, e.email, e.department,
+                   f.date, f.start_time, f.end_time, f.duration_minutes
+            FROM effective f
+            JOIN employees e ON e.employee_id = f.employee_id
+            ORDER BY f.date, f.employee_id
+        """
+
+        cursor.execute(query, params)
+
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+
+            yield [
+                {
+                    "employee_id": r[0],
+                    "name": r[1],
+                    "email": r[2],
+                    "department": r[3],
+                    "date": r[4],
+                    "start_time": r[5],
+                    "end_time": r[6],
+                    "duration_minutes": r[7]
+                }
+                for r in rows
+            ]
+    finally:
+        conn.close()
+
+
 # --------------------------------------------------
 # Initialize DB
 # --------------------------------------------------
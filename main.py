@@ -3,6 +3,8 @@
 
 from orchestrator import Orchestrator
 from utils.intent_parser import parse_intent
+from utils.llm_scheduler import INTERACTIVE
+from utils.session_store import DEFAULT_SESSION_ID
 
 def format_response(response):
     if isinstance(response, dict):
@@ -22,6 +24,34 @@ def format_response(response):
         return "✅ Done."
     return response
 
+def show_progress(intent):
+    """
+    Early console feedback while the rest of the LLM response streams in.
+    """
+    if intent not in ("greeting", "help", "unknown"):
+        print(f"Bot: ⏳ Working on: {intent.replace('_', ' ')}...", flush=True)
+
+def process_turn(orchestrator, user_input, session_id=DEFAULT_SESSION_ID, on_intent=None,
+                 priority=INTERACTIVE):
+    """
+    Run one chat turn for a session and return the reply text.
+    Shared by the console loop and the HTTP server.
+    on_intent streams the LLM output and reports the intent early;
+    priority is the LLM scheduler class for this turn.
+    """
+    # 🔑 KEY FIX: Check for active state
+    if orchestrator.has_active_state(session_id):
+        response = orchestrator.handle_followup(user_input, session_id=session_id)
+    else:
+        intent_data = parse_intent(user_input, on_intent=on_intent, priority=priority)
+
+        if intent_data.get("intent") == "unknown":
+            return "Sorry, I couldn’t understand that. Please rephrase."
+
+        response = orchestrator.handle_intent(intent_data, session_id=session_id)
+
+    return format_response(response)
+
 def main():
     orchestrator = Orchestrator()
 
@@ -35,19 +65,7 @@ def main():
             print("👋 Goodbye!")
             break
 
-        # 🔑 KEY FIX: Check for active state
-        if orchestrator.has_active_state():
-            response = orchestrator.handle_followup(user_input)
-        else:
-            intent_data = parse_intent(user_input)
-
-            if intent_data.get("intent") == "unknown":
-                print("Bot: Sorry, I couldn’t understand that. Please rephrase.\n")
-                continue
-
-            response = orchestrator.handle_intent(intent_data)
-
-        print("Bot:", format_response(response))
+        print("Bot:", process_turn(orchestrator, user_input, on_intent=show_progress))
         print()
 
 
@@ -1,6 +1,11 @@
 # orchestrator.py
 # Supervisor agent with proper stateful conversation handling
 # Handles multi-step flows for registration, attendance, and reports
+# Conversation state is kept per session id (utils/session_store.py)
+# Flows are declared once in a registry (utils/flows.py) and driven
+# by one generic state machine
+
+from datetime import datetime, timedelta
 
 from agents.employee_agent import EmployeeAgent
 from agents.attendance_agent import AttendanceAgent
@@ -8,137 +13,423 @@ from agents.report_agent import ReportAgent
 from agents.knowledge_agent import KnowledgeAgent
 
 from db.database import (
+    LEAVE_ENTITLEMENTS,
     attendance_exists,
+    add_shift_template,
+    apply_leave,
     assign_working_hours,
-    get_working_hours
+    bulk_assign_working_hours,
+    get_employee_by_id,
+    get_leave_balance
+)
+from utils.audit_log import current_actor
+from utils.compliance import check_compliance, format_compliance
+from utils.entity_normalizer import employee_index
+from utils.flows import Flow, validate_date, validate_employee_id, validate_time
+from utils.session_store import (
+    DEFAULT_SESSION_ID,
+    DEFAULT_TTL_SECONDS,
+    SessionStore,
+    new_state
 )
 
+GREETING_REPLY = (
+    "👋 Hi! I’m your HR assistant.\n"
+    "I can help you with:\n"
+    "- Employee registration\n"
+    "- Attendance information\n"
+    "- Daily work reports\n"
+    "- HR policies\n\n"
+    "How can I help you?"
+)
+
+HELP_REPLY = (
+    "📋 Here’s what I can help you with:\n"
+    "1️⃣ Register employees\n"
+    "2️⃣ Find or list employees\n"
+    "3️⃣ View attendance & working hours\n"
+    "4️⃣ Generate daily work reports\n"
+    "5️⃣ HR policies\n\n"
+    "Just tell me what you want to do 😊"
+)
+
+# Longest period a single bulk assignment may cover
+MAX_BULK_DAYS = 366
+
+
+def _working_days(start_date, end_date):
+    """
+    Monday-Friday dates between start_date and end_date (inclusive).
+    """
+    start = datetime.strptime(start_date, "%Y-%m-%d").date()
+    end = datetime.strptime(end_date, "%Y-%m-%d").date()
+
+    if end < start:
+        raise ValueError("The end date must not be before the start date.")
+
+    if (end - start).days >= MAX_BULK_DAYS:
+        raise ValueError(f"Please provide a period of at most {MAX_BULK_DAYS} days.")
+
+    return [
+        (start + timedelta(days=i)).isoformat()
+        for i in range((end - start).days + 1)
+        if (start + timedelta(days=i)).weekday() < 5
+    ]
+
+
+# Every date field is normalised to YYYY-MM-DD, including follow-up answers
+DATE_VALIDATORS = {
+    "date": validate_date,
+    "start_date": validate_date,
+    "end_date": validate_date
+}
+
+
+WEEKDAY_NAMES = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+
+def _parse_weekdays(value):
+    """
+    'weekdays', 'mon-fri', 'monday to friday', 'mon, wed, fri' -> [0, ..., 6]
+    (0 = Monday).
+    """
+    if isinstance(value, list):
+        value = ",".join(str(v) for v in value)
+
+    text = str(value).lower().strip()
+
+    if text in ["weekdays", "weekday", "working days"]:
+        return [0, 1, 2, 3, 4]
+    if text in ["weekend", "weekends"]:
+        return [5, 6]
+    if text in ["daily", "every day", "all", "all days"]:
+        return list(range(7))
+
+    text = text.replace(" to ", "-").replace(" and ", ",").replace("&", ",")
+    days = set()
+
+    for token in text.replace("/", ",").split(","):
+        token = token.strip()
+        if not token:
+            continue
+
+        bounds = [WEEKDAY_NAMES.index(t.strip()[:3]) if t.strip()[:3] in WEEKDAY_NAMES else None
+                  for t in token.split("-", 1)]
+
+        if None in bounds:
+            raise ValueError("Weekdays must look like 'mon-fri' or 'mon, wed, fri'.")
+
+        first, last = bounds[0], bounds[-1]
+        day = first
+        while True:
+            days.add(day)
+            if day == last:
+                break
+            day = (day + 1) % 7
+
+    if not days:
+        raise ValueError("Weekdays must look like 'mon-fri' or 'mon, wed, fri'.")
+
+    return sorted(days)
+
+
+def _parse_leave_type(value):
+    """
+    'Sick', 'casual leave', 'CL' -> 'sick' / 'casual'.
+    """
+    text = str(value).lower().strip()
+
+    for leave_type in LEAVE_ENTITLEMENTS:
+        if text.startswith(leave_type) or text == leave_type[0] + "l":
+            return leave_type
+
+    raise ValueError(
+        f"Leave type must be one of: {', '.join(LEAVE_ENTITLEMENTS)}."
+    )
+
+
 class Orchestrator:
-    def __init__(self):
+    def __init__(self, session_ttl_seconds=DEFAULT_TTL_SECONDS, session_store=None,
+                 watch_policies=True):
         self.employee_agent = EmployeeAgent()
         self.attendance_agent = AttendanceAgent()
         self.report_agent = ReportAgent()
-        self.knowledge_agent = KnowledgeAgent()
+        self.knowledge_agent = KnowledgeAgent(watch=watch_policies)
+
+        # Employee lookups are served from memory
+        employee_index.load()
+
+        # Conversation state, one per session id
+        # (a SharedSessionStore when several processes serve sessions)
+        if session_store is None:
+            session_store = SessionStore(ttl_seconds=session_ttl_seconds)
+        self.sessions = session_store
+
+        # Intent -> Flow
+        self.flows = {flow.intent: flow for flow in self._build_flows()}
 
-        # Conversation state
-        self.state = {
-            "current_intent": None,
-            "pending_data": {},
-            "expected_field": None
-        }
+    # -------------------------
+    # Flow registry
+    # -------------------------
+    def _build_flows(self):
+        return [
+            Flow("greeting", reply=GREETING_REPLY),
+            Flow("help", reply=HELP_REPLY),
+            Flow(
+                "register_employee",
+                required=["name", "email", "department"],
+                prompt="To register an employee, please provide the following details:",
+                multi_value=True,
+                action=self._register_employee
+            ),
+            Flow(
+                "find_employee",
+                any_of=["employee_id", "name"],
+                validators={"employee_id": validate_employee_id},
+                prompt={"employee_id": "Please provide employee_id or name."},
+                action=self._find_employee
+            ),
+            Flow(
+                "list_employees",
+                required=["department"],
+                validators={"after_id": validate_employee_id},
+                prompt={"department": "Which department should I list employees for?"},
+                action=self._list_employees
+            ),
+            Flow(
+                "attendance_info",
+                required=["employee_id", "date"],
+                validators=DATE_VALIDATORS,
+                prompt={
+                    "employee_id": "Please provide employee ID to check working hours.",
+                    "date": "Please provide the date."
+                },
+                action=self._attendance_info
+            ),
+            Flow(
+                "daily_report",
+                required=["employee_id"],
+                validators=DATE_VALIDATORS,
+                prompt={"employee_id": "Please provide your employee ID to generate daily report."},
+                action=self._daily_report
+            ),
+            Flow(
+                "assign_working_hours",
+                required=["employee_id", "date", "start_time", "end_time"],
+                validators={
+                    **DATE_VALIDATORS,
+                    "employee_id": validate_employee_id,
+                    "start_time": validate_time,
+                    "end_time": validate_time
+                },
+                prompt="To assign working hours, please provide:",
+                action=self._assign_working_hours
+            ),
+            Flow(
+                "bulk_assign_working_hours",
+                required=["department", "start_date", "end_date", "start_time", "end_time"],
+                validators={**DATE_VALIDATORS, "start_time": validate_time, "end_time": validate_time},
+                prompt="To assign working hours to a department, please provide:",
+                action=self._bulk_assign_working_hours
+            ),
+            Flow(
+                "assign_shift_template",
+                required=["weekdays", "start_time", "end_time"],
+                any_of=["employee_id", "department"],
+                validators={
+                    **DATE_VALIDATORS,
+                    "employee_id": validate_employee_id,
+                    "weekdays": _parse_weekdays,
+                    "start_time": validate_time,
+                    "end_time": validate_time
+                },
+                prompt="To set up a recurring shift, please provide:",
+                action=self._assign_shift_template
+            ),
+            Flow(
+                "hours_summary",
+                required=["start_date", "end_date"],
+                validators={**DATE_VALIDATORS, "employee_id": validate_employee_id},
+                prompt="To summarise working hours, please provide:",
+                action=self._hours_summary
+            ),
+            Flow(
+                "compliance_check",
+                required=["start_date", "end_date"],
+                validators={**DATE_VALIDATORS, "employee_id": validate_employee_id},
+                prompt="To check working-hours compliance, please provide:",
+                action=self._compliance_check
+            ),
+            Flow(
+                "apply_leave",
+                required=["employee_id", "leave_type", "start_date", "end_date"],
+                validators={
+                    **DATE_VALIDATORS,
+                    "employee_id": validate_employee_id,
+                    "leave_type": _parse_leave_type
+                },
+                prompt="To apply for leave, please provide:",
+                action=self._apply_leave
+            ),
+            Flow(
+                "leave_balance",
+                required=["employee_id"],
+                validators={**DATE_VALIDATORS, "employee_id": validate_employee_id},
+                prompt={"employee_id": "Please provide the employee ID to check leave balance."},
+                action=self._leave_balance
+            ),
+            Flow("hr_policy", action=self._hr_policy)
+        ]
 
     # -------------------------
     # State helpers
     # -------------------------
-    def has_active_state(self):
-        return self.state["current_intent"] is not None
+    def has_active_state(self, session_id=DEFAULT_SESSION_ID):
+        return self.sessions.has_active_state(session_id)
 
-    def reset_state(self):
-        self.state = {
-            "current_intent": None,
-            "pending_data": {},
-            "expected_field": None
-        }
+    def reset_state(self, session_id=DEFAULT_SESSION_ID):
+        self.sessions.reset(session_id)
+
+    def _reset(self, state):
+        state.clear()
+        state.update(new_state())
+
+    # -------------------------
+    # Generic state machine
+    # -------------------------
+    def _advance(self, state, flow, errors=None):
+        """
+        Ask for the next missing field, or run the terminal action.
+        A value that failed validation is asked for again, even for an
+        optional field: the action never runs without it.
+        """
+        data = state["pending_data"]
+        errors = errors or {}
+        missing = flow.missing_fields(data)
+
+        if missing:
+            state["expected_field"] = missing[0]
+            question = flow.ask(missing)
+            return "\n".join([*errors.values(), question]) if errors else question
+
+        if errors:
+            field = next(iter(errors))
+            state["expected_field"] = field
+            return "\n".join([
+                *errors.values(),
+                f"Please provide a valid {field.replace('_', ' ')}."
+            ])
+
+        self._reset(state)
+        return flow.action(data)
 
     # -------------------------
     # Follow-up handler
     # -------------------------
-    
-    def handle_followup(self, user_input):
-        intent = self.state["current_intent"]
-
-        # ---------- REGISTRATION (special case) ----------
-        if intent == "register_employee":
-            values = [v.strip() for v in user_input.split(",") if v.strip()]
-            
-            required_fields = ["name", "email", "department"]
-
-            missing_fields = [
-                f for f in required_fields
-                if not self.state["pending_data"].get(f)
-            ]
-
-            for i, value in enumerate(values):
-                if i < len(missing_fields):
-                    self.state["pending_data"][missing_fields[i]] = value
-
-            return self._continue_register_employee()
-
-        # ---------- ALL OTHER FLOWS (simple assignment) ----------
-        field = self.state["expected_field"]
-        self.state["pending_data"][field] = user_input.strip()
-
-        if intent == "daily_report":
-            return self._continue_daily_report()
-        
-        if intent == "attendance_info":
-            self.state["pending_data"][self.state["expected_field"]] = user_input.strip()
-            return self._continue_attendance_info()
-
-        if intent == "find_employee":
-            response = self.employee_agent.find_employee(
-                name=self.state["pending_data"].get("name"),
-                employee_id=self.state["pending_data"].get("employee_id")
-            )
-            self.reset_state()
-            return response
-        
-        if intent == "assign_working_hours":
-            self.state["pending_data"][self.state["expected_field"]] = user_input.strip()
-            return self._continue_assign_working_hours()
-        
-        return "Something went wrong."
+    def handle_followup(self, user_input, session_id=DEFAULT_SESSION_ID):
+        token = current_actor.set(session_id)
+        try:
+            with self.sessions.session(session_id) as state:
+                return self._handle_followup(state, user_input)
+        finally:
+            current_actor.reset(token)
+
+    def _handle_followup(self, state, user_input):
+        flow = self.flows.get(state["current_intent"])
+
+        if flow is None or flow.action is None:
+            self._reset(state)
+            return "Something went wrong."
+
+        values = flow.followup_values(
+            state["pending_data"], state["expected_field"], user_input
+        )
+        errors = flow.merge(state["pending_data"], values)
+
+        return self._advance(state, flow, errors)
 
     # -------------------------
-    # Register employee flow
+    # Main intent handler
     # -------------------------
-    def _continue_register_employee(self):
-        required_fields = ["name", "email", "department"]
+    def handle_intent(self, intent_data, session_id=DEFAULT_SESSION_ID):
+        token = current_actor.set(session_id)
+        try:
+            with self.sessions.session(session_id) as state:
+                return self._handle_intent(state, intent_data)
+        finally:
+            current_actor.reset(token)
 
-        missing_fields = [
-            field for field in required_fields
-            if not self.state["pending_data"].get(field)
-        ]
+    def _handle_intent(self, state, intent_data):
+        flow = self.flows.get(intent_data.get("intent"))
 
-        # If something is missing, ask clearly
-        if missing_fields:
-            # Always expect the NEXT missing field
-            self.state["expected_field"] = missing_fields[0]
+        if flow is None:
+            return "Sorry, I cannot handle this request."
 
-            missing_text = "\n".join(f"- {field}" for field in missing_fields)
+        if flow.reply is not None:
+            return flow.reply
 
-            return (
-                "To register an employee, please provide the following details:\n"
-                f"{missing_text}"
-            )
+        state["current_intent"] = flow.intent
+        errors = flow.merge(state["pending_data"], intent_data)
 
-        # All data present → register
-        response = self.employee_agent.register_employee(
-            name=self.state["pending_data"]["name"],
-            email=self.state["pending_data"]["email"],
-            department=self.state["pending_data"]["department"]
+        return self._advance(state, flow, errors)
+
+    # -------------------------
+    # Register employee
+    # -------------------------
+    def _register_employee(self, data):
+        return self.employee_agent.register_employee(
+            name=data["name"],
+            email=data["email"],
+            department=data["department"]
         )
 
-        self.reset_state()
-        return response
-   
+    # -------------------------
+    # Find employee
+    # -------------------------
+    def _find_employee(self, data):
+        return self.employee_agent.find_employee(
+            name=data.get("name"),
+            employee_id=data.get("employee_id"),
+            email=data.get("email"),
+            department=data.get("department")
+        )
 
     # -------------------------
-    # Daily report flow
+    # List employees (directory, one page per turn)
     # -------------------------
-    def _continue_daily_report(self):
-        if not self.state["pending_data"].get("employee_id"):
-            self.state["expected_field"] = "employee_id"
-            return "Please provide your employee ID to generate daily report."
+    def _list_employees(self, data):
+        result = self.employee_agent.list_employees(
+            department=data["department"],
+            after_id=data.get("after_id")
+        )
+        department = result["department"]
+
+        if not result["employees"]:
+            if data.get("after_id"):
+                return f"No more employees in department {department}."
+            return f"No employees found in department {department}."
+
+        lines = [f"👥 Employees in {department}"]
+        for emp in result["employees"]:
+            lines.append(f"- {emp['name']} (ID {emp['employee_id']}) – {emp['email']}")
+
+        if result["next_after_id"] is not None:
+            lines.append(
+                f"\nMore employees follow. Say 'list employees in {department} "
+                f"after {result['next_after_id']}' for the next page."
+            )
+
+        return "\n".join(lines)
 
+    # -------------------------
+    # Daily report
+    # -------------------------
+    def _daily_report(self, data):
         response = self.report_agent.generate_daily_report(
-            employee_id=self.state["pending_data"]["employee_id"],
-            date=self.state["pending_data"].get("date")
+            employee_id=data["employee_id"],
+            date=data.get("date")
         )
 
-        # Reset state after terminal response
-        self.reset_state()
-
         # Human-friendly response
         if response.get("status") == "success":
             return (
@@ -147,55 +438,19 @@ class Orchestrator:
             )
 
         return response.get("message", "Unable to generate daily report.")
-    
-    def _continue_attendance_summary(self):
-        if not self.state["pending_data"].get("employee_id"):
-            self.state["expected_field"] = "employee_id"
-            return "Please provide employee ID."
-
-        employee_id = self.state["pending_data"]["employee_id"]
-        date = self.state["pending_data"].get("date")
 
-        attendance = self.attendance_agent.get_attendance(
-            employee_id=employee_id,
-            date=date
-        )
-
-        report = self.report_agent.generate_daily_report(
-            employee_id=employee_id,
-            date=date
-        )
-
-        self.reset_state()
-
-        return {
-            "status": "success",
-            "attendance": attendance,
-            "report": report
-        }
-    
     # -------------------------
-    # Attendance info flow (READ ONLY)
+    # Attendance info (READ ONLY)
     # -------------------------
-    def _continue_attendance_info(self):
-        if not self.state["pending_data"].get("employee_id"):
-            self.state["expected_field"] = "employee_id"
-            return "Please provide employee ID to check working hours."
-
-        if not self.state["pending_data"].get("date"):
-            self.state["expected_field"] = "date"
-            return "Please provide the date."
-
-        employee_id = self.state["pending_data"]["employee_id"]
-        date = self.state["pending_data"]["date"]
+    def _attendance_info(self, data):
+        employee_id = data["employee_id"]
+        date = data["date"]
 
         attendance = self.attendance_agent.get_attendance(
             employee_id=employee_id,
             date=date
         )
 
-        self.reset_state()
-
         if not attendance:
             return (
                 f"No working hours assigned for employee {employee_id} on {date}."
@@ -212,47 +467,33 @@ class Orchestrator:
         )
 
     # -------------------------
-    # Assign working hours flow (HR-driven)
+    # Assign working hours (HR-driven)
     # -------------------------
-    def _continue_assign_working_hours(self):
-        required_fields = ["employee_id", "date", "start_time", "end_time"]
+    def _assign_working_hours(self, data):
+        employee_id = data["employee_id"]
+        date = data["date"]
+        start_time = data["start_time"]
+        end_time = data["end_time"]
 
-        missing_fields = [
-            f for f in required_fields
-            if not self.state["pending_data"].get(f)
-        ]
-
-        # Ask for missing info
-        if missing_fields:
-            self.state["expected_field"] = missing_fields[0]
-
-            missing_text = "\n".join(f"- {f}" for f in missing_fields)
-            return (
-                "To assign working hours, please provide:\n"
-                f"{missing_text}"
-            )
-
-        employee_id = self.state["pending_data"]["employee_id"]
-        date = self.state["pending_data"]["date"]
-        start_time = self.state["pending_data"]["start_time"]
-        end_time = self.state["pending_data"]["end_time"]
+        if not get_employee_by_id(employee_id):
+            return f"No employee found with ID {employee_id}."
 
         # Check duplicate
         if attendance_exists(employee_id, date):
-            self.reset_state()
             return (
                 f"⚠️ Working hours already exist for employee {employee_id} on {date}."
             )
 
-        # Assign working hours
-        assign_working_hours(
-            employee_id=employee_id,
-            date=date,
-            start_time=start_time,
-            end_time=end_time
-        )
-
-        self.reset_state()
+        # Assign working hours (archived years are read-only)
+        try:
+            assign_working_hours(
+                employee_id=employee_id,
+                date=date,
+                start_time=start_time,
+                end_time=end_time
+            )
+        except ValueError as e:
+            return f"⚠️ {e}"
 
         return (
             f"✅ Working hours assigned successfully.\n"
@@ -262,109 +503,227 @@ class Orchestrator:
         )
 
     # -------------------------
-    # Main intent handler
+    # Bulk assign working hours (department + period)
     # -------------------------
-    def handle_intent(self, intent_data):
-        intent = intent_data.get("intent")
+    def _bulk_assign_working_hours(self, data):
+        department = data["department"].strip().upper()
+        start_time = data["start_time"]
+        end_time = data["end_time"]
+
+        try:
+            dates = _working_days(data["start_date"], data["end_date"])
+        except ValueError as e:
+            message = str(e)
+            if "does not match format" in message:
+                message = "Dates must be in YYYY-MM-DD format."
+            return f"⚠️ {message}"
+
+        try:
+            result = bulk_assign_working_hours(
+                department=department,
+                dates=dates,
+                start_time=start_time,
+                end_time=end_time
+            )
+        except ValueError as e:
+            return f"⚠️ {e}"
+
+        if not result["employees"]:
+            return f"No employees found in department {department}."
+
+        response = (
+            f"✅ Working hours assigned for department {department}.\n"
+            f"Period: {data['start_date']} – {data['end_date']} ({len(dates)} working days)\n"
+            f"Time: {start_time} – {end_time}\n"
+            f"Employees: {result['employees']}\n"
+            f"Records created: {result['inserted']}"
+        )
 
-        if intent == "greeting":
-            return (
-                "👋 Hi! I’m your HR assistant.\n"
-                "I can help you with:\n"
-                "- Employee registration\n"
-                "- Attendance information\n"
-                "- Daily work reports\n"
-                "- HR policies\n\n"
-                "How can I help you?"
+        conflicts = result["conflicts"]
+        if conflicts:
+            shown = ", ".join(f"{eid} on {date}" for eid, date in conflicts[:5])
+            more = f" (+{len(conflicts) - 5} more)" if len(conflicts) > 5 else ""
+            response += (
+                f"\n⚠️ Skipped {len(conflicts)} already assigned: {shown}{more}"
             )
-        
-        if intent == "help":
-            return (
-                "📋 Here’s what I can help you with:\n"
-                "1️⃣ Register employees\n"
-                "2️⃣ Find employee details\n"
-                "3️⃣ View attendance & working hours\n"
-                "4️⃣ Generate daily work reports\n"
-                "5️⃣ HR policies\n\n"
-                "Just tell me what you want to do 😊"
+
+        return response
+
+    # -------------------------
+    # Recurring shift template (employee or department)
+    # -------------------------
+    def _assign_shift_template(self, data):
+        employee_id = data.get("employee_id")
+        department = None if employee_id else data["department"].strip().upper()
+        valid_from = data.get("start_date") or data.get("date") or datetime.now().strftime("%Y-%m-%d")
+
+        add_shift_template(
+            weekdays=data["weekdays"],
+            start_time=data["start_time"],
+            end_time=data["end_time"],
+            valid_from=valid_from,
+            valid_to=data.get("end_date"),
+            employee_id=int(employee_id) if employee_id else None,
+            department=department
+        )
+
+        target = f"employee {employee_id}" if employee_id else f"department {department}"
+        days = ", ".join(WEEKDAY_NAMES[d].title() for d in data["weekdays"])
+
+        return (
+            f"✅ Recurring shift saved for {target}.\n"
+            f"Days: {days}\n"
+            f"Time: {data['start_time']} – {data['end_time']}\n"
+            f"From: {valid_from}" + (f" to {data['end_date']}" if data.get("end_date") else "")
+        )
+
+    # -------------------------
+    # Hours summary (totals / averages / overtime)
+    # -------------------------
+    def _hours_summary(self, data):
+        start_date = data["start_date"]
+        end_date = data["end_date"]
+
+        # A range over too many archived years is refused
+        try:
+            rows = self.attendance_agent.get_hours_summary(
+                start_date=start_date,
+                end_date=end_date,
+                employee_id=data.get("employee_id"),
+                department=data.get("department")
             )
+        except ValueError as e:
+            return f"⚠️ {e}"
+
+        if not rows:
+            return f"No working hours found between {start_date} and {end_date}."
 
-        # -------- REGISTER EMPLOYEE --------
-        if intent == "register_employee":
-            self.state["current_intent"] = "register_employee"
-            self.state["pending_data"].update(
-                {k: v for k, v in intent_data.items() if v}
+        lines = [f"📊 Working Hours Summary ({start_date} – {end_date})"]
+
+        for row in rows:
+            label = (
+                f"{row['name']} (ID {row['employee_id']})"
+                if "employee_id" in row
+                else f"{row['department']} ({row['employees']} employees)"
             )
-            return self._continue_register_employee()
-        
-        # -------- ATTENDANCE INFO (READ ONLY) --------
-        if intent == "attendance_info":
-            self.state["current_intent"] = "attendance_info"
-            self.state["pending_data"].update(
-                {k: v for k, v in intent_data.items() if v}
+            lines.append(
+                f"- {label}: {row['total_hours']} h total, "
+                f"{row['average_hours']} h/day avg, "
+                f"{row['overtime_hours']} h overtime ({row['days']} days)"
             )
-            return self._continue_attendance_info()
-
-        
-        # -------- FIND EMPLOYEE (FIXED) --------
-        if intent == "find_employee":
-            self.state["current_intent"] = "find_employee"
-            self.state["pending_data"].update(
-                {k: v for k, v in intent_data.items() if v}
+
+        return "\n".join(lines)
+
+    # -------------------------
+    # Compliance check (late starts / early leaves / overtime)
+    # -------------------------
+    def _compliance_check(self, data):
+        start_date = data["start_date"]
+        end_date = data["end_date"]
+
+        # A range over too many archived years is refused
+        try:
+            result = check_compliance(
+                start_date,
+                end_date,
+                employee_id=data.get("employee_id"),
+                department=data.get("department")
             )
+        except ValueError as e:
+            return f"⚠️ {e}"
 
-            # If neither ID nor name provided, ask for it
-            if not self.state["pending_data"].get("employee_id") and not self.state["pending_data"].get("name"):
-                self.state["expected_field"] = "employee_id"
-                return "Please provide employee_id or name."
+        if not result["rows_checked"]:
+            return f"No working hours found between {start_date} and {end_date}."
 
-            # We already have enough data → search
-            response = self.employee_agent.find_employee(
-                name=self.state["pending_data"].get("name"),
-                employee_id=self.state["pending_data"].get("employee_id")
+        if not result["rows_flagged"]:
+            return (
+                f"✅ No policy violations between {start_date} and {end_date} "
+                f"({result['rows_checked']} days checked)."
             )
 
-            self.reset_state()
-            return response
-        
+        return format_compliance(result)
+
+    # -------------------------
+    # Leave (apply / balance)
+    # -------------------------
+    def _apply_leave(self, data):
+        employee_id = int(data["employee_id"])
+        leave_type = data["leave_type"]
+
+        if not get_employee_by_id(employee_id):
+            return f"No employee found with ID {employee_id}."
+
+        try:
+            dates = _working_days(data["start_date"], data["end_date"])
+        except ValueError as e:
+            message = str(e)
+            if "does not match format" in message:
+                message = "Dates must be in YYYY-MM-DD format."
+            return f"⚠️ {message}"
+
+        if not dates:
+            return "⚠️ The requested period has no working days."
+
+        result = apply_leave(employee_id, leave_type, dates)
+
+        if result["status"] == "overlap":
+            shown = ", ".join(f"{start} – {end}" for start, end in result["conflicts"])
+            return f"⚠️ Employee {employee_id} already has leave booked for {shown}."
 
-        # -------- DAILY REPORT --------
-        if intent == "daily_report":
-            self.state["current_intent"] = "daily_report"
-            self.state["pending_data"].update(
-                {k: v for k, v in intent_data.items() if v}
+        if result["status"] == "insufficient":
+            return (
+                f"⚠️ Not enough {leave_type} leave in {result['year']}: "
+                f"requested {result['requested']} day(s), "
+                f"{result['remaining']} remaining."
             )
-            return self._continue_daily_report()
-        
-        # -------- ASSIGN WORKING HOURS (HR) --------
-        if intent == "assign_working_hours":
-            self.state["current_intent"] = "assign_working_hours"
-            self.state["pending_data"].update(
-                {k: v for k, v in intent_data.items() if v}
+
+        balance = get_leave_balance(employee_id, dates[-1][:4])[leave_type]
+
+        return (
+            f"✅ Leave applied successfully.\n"
+            f"Employee ID: {employee_id}\n"
+            f"Type: {leave_type}\n"
+            f"Period: {data['start_date']} – {data['end_date']} ({result['days']} working days)\n"
+            f"Remaining {leave_type} leave: {balance['remaining']} of {balance['entitled']}"
+        )
+
+    def _leave_balance(self, data):
+        employee_id = int(data["employee_id"])
+
+        if not get_employee_by_id(employee_id):
+            return f"No employee found with ID {employee_id}."
+        date = data.get("date") or data.get("start_date")
+        year = date[:4] if date else str(datetime.now().year)
+
+        balance = get_leave_balance(employee_id, year)
+
+        lines = [f"🌴 Leave balance for employee {employee_id} ({year})"]
+        for leave_type, b in balance.items():
+            lines.append(
+                f"- {leave_type.capitalize()}: {b['remaining']} of {b['entitled']} remaining "
+                f"({b['used']} used)"
             )
-            return self._continue_assign_working_hours()
 
-        # -------- HR POLICY --------
-        
-        if intent == "hr_policy":
-            query = intent_data.get("query")
+        return "\n".join(lines)
 
-            if not query:
-                return (
-                    "📘 Please specify which HR policy you want to know about.\n"
-                    "For example: leave policy, attendance policy, working hours."
-                )
+    # -------------------------
+    # HR policy
+    # -------------------------
+    def _hr_policy(self, data):
+        query = data.get("query")
 
-            response = self.knowledge_agent.search_policy(query)
+        if not query:
+            return (
+                "📘 Please specify which HR policy you want to know about.\n"
+                "For example: leave policy, attendance policy, working hours."
+            )
 
-            if not response:
-                return (
-                    "📘 I couldn’t find a matching HR policy.\n"
-                    "You can ask about leave policy, attendance policy, or working hours."
-                )
+        response = self.knowledge_agent.search_policy(query)
 
-            return response
+        if not response:
+            return (
+                "📘 I couldn’t find a matching HR policy.\n"
+                "You can ask about leave policy, attendance policy, or working hours."
+            )
 
-        return "Sorry, I cannot handle this request."
-    
-        
\ No newline at end of file
+        return response
@@ -0,0 +1,200 @@
+# prefork.py
+# Multi-process serving mode (pre-fork worker pool)
+# The parent builds the Orchestrator once - loading the SentenceTransformer
+# model and the FAISS policy index - then forks workers that share those
+# pages copy-on-write. A supervisor loop restarts workers that crash.
+#
+# Conversation state is kept in a SQLite-backed SharedSessionStore
+# (HR_SESSION_DB), so a multi-step flow may continue on any worker.
+
+import argparse
+import asyncio
+import gc
+import os
+import signal
+import socket
+import time
+
+# Avoid tokenizer thread pools being forked in a locked state
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+from orchestrator import Orchestrator
+from server import DEFAULT_HOST, DEFAULT_PORT, DEFAULT_TURN_TIMEOUT, HRServer
+from utils import metrics
+from utils.session_store import SharedSessionStore
+
+DEFAULT_PROCESSES = os.cpu_count() or 2
+DEFAULT_THREADS_PER_WORKER = 16
+RESTART_BACKOFF_SECONDS = 1.0
+
+
+def _exit_on_signal(signum, frame):
+    raise SystemExit(0)
+
+
+def _bind_socket(host, port):
+    """
+    Create the listening socket in the parent so every worker accepts on it.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(1024)
+    sock.setblocking(False)
+    return sock
+
+
+class PreforkSupervisor:
+    """
+    PreforkSupervisor handles:
+    - Preloading models and indexes once in the parent
+    - Forking worker processes that serve HTTP on a shared socket
+    - Restarting workers that exit unexpectedly
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, processes=DEFAULT_PROCESSES,
+                 threads=DEFAULT_THREADS_PER_WORKER, turn_timeout=DEFAULT_TURN_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.processes = processes
+        self.threads = threads
+        self.turn_timeout = turn_timeout
+
+        self.orchestrator = None
+        self.sock = None
+        self.workers = {}
+        self.stopping = False
+
+    # -------------------------
+    # Parent: preload
+    # -------------------------
+    def preload(self):
+        # Requests of one session may reach any worker. The policy
+        # watcher thread is started in each worker, never in this
+        # parent, which keeps forking replacements
+        self.orchestrator = Orchestrator(
+            session_store=SharedSessionStore(),
+            watch_policies=False
+        )
+
+        # Move everything allocated so far out of the GC's reach, so
+        # collections in workers do not touch (and un-share) these pages
+        gc.collect()
+        gc.freeze()
+
+        self.sock = _bind_socket(self.host, self.port)
+
+    # -------------------------
+    # Worker
+    # -------------------------
+    def _run_worker(self):
+        # SIGTERM unwinds through server.shutdown() (audit log flush)
+        signal.signal(signal.SIGTERM, _exit_on_signal)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+        self.orchestrator.knowledge_agent.vector_store.start_watching()
+
+        # db.database opens a fresh SQLite connection per call, so each
+        # worker only ever uses connections it created itself.
+        server = HRServer(
+            self.orchestrator,
+            max_workers=self.threads,
+            turn_timeout=self.turn_timeout
+        )
+
+        try:
+            asyncio.run(server.serve(sock=self.sock))
+        finally:
+            server.shutdown()
+
+    def _spawn(self):
+        pid = os.fork()
+
+        if pid == 0:
+            exit_code = 0
+            try:
+                self._run_worker()
+            except Exception as e:
+                print(f"⚠️ Worker {os.getpid()} crashed:", e)
+                exit_code = 1
+            finally:
+                os._exit(exit_code)
+
+        self.workers[pid] = time.monotonic()
+        return pid
+
+    # -------------------------
+    # Supervisor loop
+    # -------------------------
+    def _stop(self, signum, frame):
+        self.stopping = True
+
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self):
+        self.preload()
+
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        for _ in range(self.processes):
+            self._spawn()
+
+        print(
+            f"🤖 HR server listening on http://{self.host}:{self.port} "
+            f"with {self.processes} workers"
+        )
+
+        while self.workers:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+
+            started = self.workers.pop(pid, None)
+            if self.stopping or started is None:
+                continue
+
+            print(f"⚠️ Worker {pid} exited (status {status}), restarting.")
+
+            # Crash loop protection: do not respawn faster than the backoff
+            uptime = time.monotonic() - started
+            if uptime < RESTART_BACKOFF_SECONDS:
+                time.sleep(RESTART_BACKOFF_SECONDS - uptime)
+
+            self._spawn()
+
+        self.sock.close()
+        print("👋 Goodbye!")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HR assistant pre-fork server.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--processes", type=int, default=DEFAULT_PROCESSES)
+    parser.add_argument("--threads", type=int, default=DEFAULT_THREADS_PER_WORKER)
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TURN_TIMEOUT)
+    parser.add_argument("--metrics", action="store_true", help="Enable metrics collection (per worker)")
+    args = parser.parse_args()
+
+    if args.metrics:
+        metrics.enable()
+
+    PreforkSupervisor(
+        host=args.host,
+        port=args.port,
+        processes=args.processes,
+        threads=args.threads,
+        turn_timeout=args.timeout
+    ).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,401 @@
+# server.py
+# Asyncio HTTP / WebSocket front end over the Orchestrator
+# Chat turns (LLM parsing + DB work) run in a thread pool, so many
+# sessions are served concurrently without blocking the event loop.
+#
+# Endpoints:
+# - GET  /health          -> {"status": "ok"}
+# - POST /chat            -> body {"session_id": "...", "message": "..."}
+# - GET  /ws?session_id=  -> WebSocket, one text frame per chat turn
+# - GET  /employees       -> directory page; ?department=&after_id=&limit=
+#                            (pass next_after_id back as after_id)
+# - GET  /metrics         -> Prometheus text format (see utils/metrics.py)
+# - GET  /metrics.json    -> same metrics as JSON
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import struct
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from main import process_turn
+from orchestrator import Orchestrator
+from utils import metrics
+from utils.audit_log import audit_log
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+DEFAULT_WORKERS = 32
+DEFAULT_TURN_TIMEOUT = 90
+MAX_BODY_BYTES = 64 * 1024
+MAX_DIRECTORY_PAGE = 500
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+HTTP_REASONS = {
+    200: "OK",
+    101: "Switching Protocols",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    504: "Gateway Timeout"
+}
+
+
+class HRServer:
+    """
+    HRServer handles:
+    - Parsing HTTP requests and WebSocket frames
+    - Offloading chat turns to a worker thread pool
+    - Enforcing a per-turn timeout
+    """
+
+    def __init__(self, orchestrator, max_workers=DEFAULT_WORKERS, turn_timeout=DEFAULT_TURN_TIMEOUT):
+        self.orchestrator = orchestrator
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.turn_timeout = turn_timeout
+
+    # -------------------------
+    # Chat turn (offloaded)
+    # -------------------------
+    async def run_turn(self, session_id, message):
+        loop = asyncio.get_running_loop()
+
+        try:
+            reply = await asyncio.wait_for(
+                loop.run_in_executor(
+                    self.executor, process_turn, self.orchestrator, message, session_id
+                ),
+                timeout=self.turn_timeout
+            )
+        except asyncio.TimeoutError:
+            return 504, {
+                "session_id": session_id,
+                "error": "Request timed out. Please try again."
+            }
+        except Exception as e:
+            print("⚠️ Chat turn failed:", e)
+            return 500, {
+                "session_id": session_id,
+                "error": "Something went wrong."
+            }
+
+        return 200, {"session_id": session_id, "reply": reply}
+
+    # -------------------------
+    # Employee directory (offloaded)
+    # -------------------------
+    async def list_employees(self, query):
+        params = parse_qs(query)
+
+        def param(name, default):
+            return params.get(name, [default])[0]
+
+        try:
+            after_id = int(param("after_id", 0))
+            limit = min(int(param("limit", 100)), MAX_DIRECTORY_PAGE)
+        except ValueError:
+            return 400, {"error": "after_id and limit must be numbers."}
+
+        if limit < 1:
+            return 400, {"error": "limit must be at least 1."}
+
+        loop = asyncio.get_running_loop()
+
+        try:
+            result = await loop.run_in_executor(
+                self.executor,
+                self.orchestrator.employee_agent.list_employees,
+                param("department", None),
+                after_id,
+                limit
+            )
+        except Exception as e:
+            print("⚠️ Employee listing failed:", e)
+            return 500, {"error": "Something went wrong."}
+
+        return 200, {
+            "department": result["department"],
+            "employees": result["employees"],
+            "next_after_id": result["next_after_id"]
+        }
+
+    # -------------------------
+    # HTTP
+    # -------------------------
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except ValueError:
+                    await self._write_json(writer, 400, {"error": "Malformed HTTP request."}, False)
+                    break
+
+                if request is None:
+                    break
+
+                method, path, headers, body = request
+                url = urlsplit(path)
+
+                if body is None:
+                    await self._write_json(writer, 413, {"error": "Request body too large."}, False)
+                    break
+
+                if url.path == "/ws" and headers.get("upgrade", "").lower() == "websocket":
+                    await self._handle_websocket(reader, writer, headers, url)
+                    break
+
+                status, payload = await self._route(method, url.path, body, url.query)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self._write_json(writer, status, payload, keep_alive)
+
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        """
+        (method, path, headers, body), None at end of stream;
+        body is None when too large. Raises ValueError when malformed.
+        """
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError:
+            return None
+
+        lines = head.decode("latin-1").split("\r\n")
+        parts = lines[0].split(" ")
+        if len(parts) != 3 or not parts[0] or not parts[1]:
+            raise ValueError(f"Malformed request line: {lines[0][:100]!r}")
+        method, path, _ = parts
+
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                key, value = line.split(":", 1)
+                headers[key.strip().lower()] = value.strip()
+
+        length = int(headers.get("content-length", 0))
+        if length < 0:
+            raise ValueError("Negative Content-Length.")
+        if length > MAX_BODY_BYTES:
+            return method, path, headers, None
+
+        body = await reader.readexactly(length) if length else b""
+        return method, path, headers, body
+
+    async def _route(self, method, path, body, query=""):
+        if path == "/health":
+            return 200, {"status": "ok"}
+
+        if path == "/employees":
+            if method != "GET":
+                return 405, {"error": "Use GET for /employees."}
+            return await self.list_employees(query)
+
+        if path == "/metrics":
+            return 200, metrics.to_prometheus()
+
+        if path == "/metrics.json":
+            return 200, metrics.snapshot()
+
+        if path != "/chat":
+            return 404, {"error": "Not found."}
+
+        if method != "POST":
+            return 405, {"error": "Use POST for /chat."}
+
+        try:
+            data = json.loads(body or b"{}")
+        except ValueError:
+            return 400, {"error": "Body must be valid JSON."}
+
+        if not isinstance(data, dict):
+            return 400, {"error": "Body must be a JSON object."}
+
+        message = data.get("message") or ""
+        session_id = data.get("session_id") or uuid.uuid4().hex
+
+        if not isinstance(message, str) or not isinstance(session_id, str):
+            return 400, {"error": "message and session_id must be strings."}
+
+        message = message.strip()
+        if not message:
+            return 400, {"error": "Please provide a message."}
+        return await self.run_turn(session_id, message)
+
+    async def _write_json(self, writer, status, payload, keep_alive=True):
+        if isinstance(payload, str):
+            body = payload.encode("utf-8")
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            content_type = "application/json; charset=utf-8"
+
+        head = (
+            f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            "\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    # -------------------------
+    # WebSocket (RFC 6455, text frames only)
+    # -------------------------
+    async def _handle_websocket(self, reader, writer, headers, url):
+        key = headers.get("sec-websocket-key")
+        if not key:
+            await self._write_json(writer, 400, {"error": "Missing Sec-WebSocket-Key."}, False)
+            return
+
+        accept = base64.b64encode(
+            hashlib.sha1((key + WS_GUID).encode("latin-1")).digest()
+        ).decode("latin-1")
+
+        writer.write((
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n"
+            "\r\n"
+        ).encode("latin-1"))
+        await writer.drain()
+
+        query = parse_qs(url.query)
+        session_id = query.get("session_id", [uuid.uuid4().hex])[0]
+
+        while True:
+            frame = await self._read_frame(reader, writer)
+            if frame is None:
+                break
+
+            try:
+                message = frame.decode("utf-8").strip()
+            except UnicodeDecodeError:
+                await self._write_frame(writer, json.dumps({
+                    "session_id": session_id,
+                    "error": "Message must be valid UTF-8 text."
+                }))
+                continue
+
+            if not message:
+                continue
+
+            _, payload = await self.run_turn(session_id, message)
+            await self._write_frame(writer, json.dumps(payload, ensure_ascii=False))
+
+    async def _read_frame(self, reader, writer):
+        """
+        Read one complete (possibly fragmented) text message.
+        Returns None when the client closes the connection.
+        """
+        message = b""
+
+        while True:
+            b1, b2 = await reader.readexactly(2)
+            fin = b1 & 0x80
+            opcode = b1 & 0x0F
+            length = b2 & 0x7F
+
+            if length == 126:
+                length = struct.unpack(">H", await reader.readexactly(2))[0]
+            elif length == 127:
+                length = struct.unpack(">Q", await reader.readexactly(8))[0]
+
+            if length > MAX_BODY_BYTES:
+                return None
+
+            mask = await reader.readexactly(4) if b2 & 0x80 else b"\x00\x00\x00\x00"
+            data = bytes(
+                b ^ mask[i % 4] for i, b in enumerate(await reader.readexactly(length))
+            )
+
+            if opcode == 0x8:
+                writer.write(b"\x88\x00")
+                await writer.drain()
+                return None
+
+            if opcode == 0x9:
+                await self._write_frame(writer, data, opcode=0xA)
+                continue
+
+            if opcode == 0xA:
+                continue
+
+            message += data
+            if fin:
+                return message
+
+    async def _write_frame(self, writer, data, opcode=0x1):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+
+        length = len(data)
+        if length < 126:
+            head = struct.pack(">BB", 0x80 | opcode, length)
+        elif length < 65536:
+            head = struct.pack(">BBH", 0x80 | opcode, 126, length)
+        else:
+            head = struct.pack(">BBQ", 0x80 | opcode, 127, length)
+
+        writer.write(head + data)
+        await writer.drain()
+
+    # -------------------------
+    # Lifecycle
+    # -------------------------
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT, sock=None):
+        if sock is not None:
+            server = await asyncio.start_server(self.handle_connection, sock=sock)
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port)
+
+        async with server:
+            await server.serve_forever()
+
+    def shutdown(self):
+        # Let running turns commit (and record their audit events) before
+        # the log is closed; turns still queued are dropped
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        audit_log.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HR assistant HTTP/WebSocket server.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--threads", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TURN_TIMEOUT)
+    parser.add_argument("--metrics", action="store_true", help="Enable metrics collection")
+    args = parser.parse_args()
+
+    if args.metrics:
+        metrics.enable()
+
+    server = HRServer(Orchestrator(), max_workers=args.threads, turn_timeout=args.timeout)
+
+    print(f"🤖 HR server listening on http://{args.host}:{args.port}")
+
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("👋 Goodbye!")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
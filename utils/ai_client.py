@@ -2,12 +2,17 @@
 # Local Ollama AI client (NO payment, NO API key)
 # This file ONLY talks to Ollama running on localhost.
 
+import json
+
 import requests
 
+from utils.metrics import timed
+
 OLLAMA_URL = "http://localhost:11434/api/chat"
 OLLAMA_MODEL = "llama3.2"
 
 
+@timed("llm.call_ollama")
 def call_ollama(system_prompt, user_prompt):
     """
     Call local Ollama model and return AI response text.
@@ -31,4 +36,37 @@ def call_ollama(system_prompt, user_prompt):
     response.raise_for_status()
 
     data = response.json()
-    return data["message"]["content"]
\ No newline at end of file
+    return data["message"]["content"]
+
+@timed("llm.stream_ollama")
+def stream_ollama(system_prompt, user_prompt):
+    """
+    Call local Ollama model in streaming mode.
+    Yields response text chunks as tokens arrive; closing the
+    generator early closes the HTTP connection.
+    """
+
+    payload = {
+        "model": OLLAMA_MODEL,
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ],
+        "stream": True
+    }
+
+    with requests.post(OLLAMA_URL, json=payload, timeout=60, stream=True) as response:
+        response.raise_for_status()
+
+        # One JSON object per line: {"message": {"content": ...}, "done": false}
+        for line in response.iter_lines():
+            if not line:
+                continue
+
+            data = json.loads(line)
+            chunk = data.get("message", {}).get("content")
+            if chunk:
+                yield chunk
+
+            if data.get("done"):
+                break
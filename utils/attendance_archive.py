@@ -0,0 +1,59 @@
+# utils/attendance_archive.py
+# Yearly partitioning of attendance
+# Closed years are moved out of the live attendance table into their own
+# compacted, read-only SQLite file (see db/database.py). Queries keep
+# spanning all years transparently; recent data stays small and hot.
+
+import argparse
+from datetime import datetime
+
+from db.database import archive_attendance_year, get_attendance_partitions
+
+# Years kept in the live table (current year and the one before)
+LIVE_YEARS = 2
+
+
+def archive_old_years(keep_years=LIVE_YEARS):
+    """
+    Archive every year with live attendance older than the
+    last keep_years years. Returns one summary per archived year.
+    """
+    cutoff = datetime.now().year - max(keep_years, 1) + 1
+    live_years = get_attendance_partitions()["live_years"]
+
+    return [archive_attendance_year(year) for year in live_years if year < cutoff]
+
+
+# --------------------------------------------------
+# Batch command
+# --------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive past years of attendance.")
+    parser.add_argument("--year", type=int, action="append",
+                        help="Archive this year (repeatable)")
+    parser.add_argument("--keep-years", type=int, default=LIVE_YEARS,
+                        help="Without --year: archive everything older than this many years")
+    parser.add_argument("--list", action="store_true", help="Only show partitions")
+    args = parser.parse_args()
+
+    if not args.list:
+        if args.year:
+            results = [archive_attendance_year(year) for year in sorted(args.year)]
+        else:
+            results = archive_old_years(args.keep_years)
+
+        for result in results:
+            print(f"Archived {result['year']}: {result['rows']} rows -> {result['file_path']}")
+
+        if not results:
+            print("Nothing to archive.")
+
+    partitions = get_attendance_partitions()
+    print("Live years:", ", ".join(map(str, partitions["live_years"])) or "-")
+    for p in partitions["archived"]:
+        print(f"Archived {p['year']}: {p['rows']} rows ({p['file_path']}, {p['archived_at']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+# utils/audit_log.py
+# Write-behind audit log of HR write operations
+# Events are buffered in memory and appended in batches to a JSONL file
+# by a background thread, so a write only pays for a deque append.
+# The file is fsync'ed periodically and on close; close() runs at exit
+# and on server shutdown. Set HR_AUDIT_LOG to a path, or "" to disable.
+
+import atexit
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+from utils import metrics
+
+DEFAULT_PATH = Path(__file__).resolve().parent.parent / "db" / "audit_log.jsonl"
+AUDIT_LOG_PATH = os.environ.get("HR_AUDIT_LOG", str(DEFAULT_PATH))
+
+# Background flush cadence and durability window
+FLUSH_INTERVAL_SECONDS = 1.0
+FSYNC_INTERVAL_SECONDS = 5.0
+
+# Events held in memory at most; a full buffer is flushed by the caller
+MAX_BUFFERED_EVENTS = 10000
+
+# Who is acting (session id), set per turn by the Orchestrator
+current_actor = contextvars.ContextVar("audit_actor", default=None)
+
+
+class AuditLog:
+    def __init__(self, path=AUDIT_LOG_PATH, flush_interval=FLUSH_INTERVAL_SECONDS,
+                 fsync_interval=FSYNC_INTERVAL_SECONDS, max_buffered=MAX_BUFFERED_EVENTS):
+        self.path = path
+        self.enabled = bool(path)
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self.max_buffered = max_buffered
+
+        self._buffer = deque()
+        self._write_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._fd = None
+        self._pid = None
+        self._last_fsync = time.monotonic()
+
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        # The parent's buffered events are its own to write, and its
+        # lock may have been held by the flush thread at fork time
+        self._buffer = deque()
+        self._write_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._fd = None
+        self._pid = None
+
+    # -------------------------
+    # Recording
+    # -------------------------
+    def record(self, action, details=None, result=None):
+        if not self.enabled or self._closed:
+            return
+
+        # First event in this process (or in a forked worker):
+        # open the file and start the flush thread
+        if self._pid != os.getpid():
+            self._start()
+
+        self._buffer.append({
+            "ts": datetime.now().isoformat(timespec="milliseconds"),
+            "pid": self._pid,
+            "actor": current_actor.get(),
+            "action": action,
+            "details": details,
+            "result": result
+        })
+
+        if len(self._buffer) >= self.max_buffered:
+            # Backpressure instead of dropping events
+            metrics.inc("audit.inline_flushes")
+            self.flush()
+
+    def _start(self):
+        with self._write_lock:
+            if self._pid == os.getpid():
+                return
+
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            self._pid = os.getpid()
+            threading.Thread(target=self._run, name="audit-flush", daemon=True).start()
+
+    # -------------------------
+    # Flushing
+    # -------------------------
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self, fsync=False):
+        """
+        Append all buffered events in one write.
+        """
+        with self._write_lock:
+            if self._fd is None:
+                return
+
+            events = []
+            while self._buffer:
+                events.append(self._buffer.popleft())
+
+            if events:
+                data = "".join(json.dumps(e, default=str) + "\n" for e in events)
+                # O_APPEND: one write per batch, safe across worker processes
+                os.write(self._fd, data.encode("utf-8"))
+                metrics.inc("audit.events", len(events))
+                metrics.inc("audit.batches")
+
+            if fsync or time.monotonic() - self._last_fsync >= self.fsync_interval:
+                os.fsync(self._fd)
+                self._last_fsync = time.monotonic()
+
+    def close(self):
+        """
+        Flush and fsync everything buffered; later events are ignored.
+        """
+        if self._closed:
+            return
+
+        self._closed = True
+        self._wakeup.set()
+        self.flush(fsync=True)
+
+        with self._write_lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+
+audit_log = AuditLog()
+atexit.register(audit_log.close)
+
+
+def audited(action):
+    """
+    Decorator: record a successful call (arguments and result)
+    in the audit log.
+    """
+
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            result = fn(*args, **kwargs)
+
+            if audit_log.enabled:
+                details = dict(signature.bind(*args, **kwargs).arguments)
+                audit_log.record(action, details, result)
+
+            return result
+
+        return wrapper
+
+    return decorator
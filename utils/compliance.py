@@ -0,0 +1,182 @@
+# utils/compliance.py
+# Working-hours compliance scan against HR policy rules
+# Loads a period of attendance into NumPy arrays and flags late starts,
+# early leaves, weekend work and overtime for all rows at once.
+# Rules come from data/compliance_rules.json (or HR_COMPLIANCE_RULES).
+
+import argparse
+import json
+import os
+
+import numpy as np
+
+from db.database import get_effective_attendance, time_to_minutes
+
+RULES_PATH = os.environ.get("HR_COMPLIANCE_RULES", "data/compliance_rules.json")
+
+# WORKING POLICY: 9:00 AM - 6:00 PM, Monday to Friday
+DEFAULT_RULES = {
+    "office_start": "09:00",
+    "office_end": "18:00",
+    "grace_minutes": 0,
+    "workdays": ["mon", "tue", "wed", "thu", "fri"],
+    "max_daily_hours": 9
+}
+
+WEEKDAY_NAMES = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+RULE_LABELS = {
+    "late_start": "Late start",
+    "early_leave": "Early leave",
+    "weekend_work": "Non-working-day work",
+    "overtime": "Overtime"
+}
+
+
+def load_rules(path=None, overrides=None):
+    """
+    Default rules, updated from the JSON rules file (if present)
+    and then from explicit overrides.
+    """
+    rules = dict(DEFAULT_RULES)
+    path = path or RULES_PATH
+
+    if path and os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            rules.update(json.load(f))
+
+    if overrides:
+        rules.update(overrides)
+
+    return rules
+
+
+def _minutes_to_time(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+# --------------------------------------------------
+# Vectorised scan
+# --------------------------------------------------
+
+def check_compliance(start_date, end_date, employee_id=None, department=None, rules=None):
+    """
+    Flag policy violations for every attendance day in a period.
+    """
+    rules = rules or load_rules()
+
+    data = get_effective_attendance(
+        start_date, end_date, employee_id=employee_id, department=department
+    )
+
+    start = np.asarray(data["start_minute"], dtype=np.int32)
+    end = np.asarray(data["end_minute"], dtype=np.int32)
+    duration = np.asarray(data["duration_minutes"], dtype=np.int32)
+    weekday = np.asarray(data["weekday"], dtype=np.int8)
+    employees = np.asarray(data["employee_id"], dtype=np.int64)
+
+    office_start = time_to_minutes(rules["office_start"])
+    office_end = time_to_minutes(rules["office_end"])
+    grace = int(rules["grace_minutes"])
+    workdays = [WEEKDAY_NAMES.index(d[:3].lower()) for d in rules["workdays"]]
+    max_daily = int(float(rules["max_daily_hours"]) * 60)
+
+    workday = np.isin(weekday, workdays)
+    overnight = end < start
+
+    flags = {
+        "late_start": workday & (start > office_start + grace),
+        "early_leave": workday & ~overnight & (end < office_end - grace),
+        "weekend_work": ~workday,
+        "overtime": duration > max_daily
+    }
+
+    matrix = np.column_stack(list(flags.values())) if len(start) else np.zeros((0, len(flags)), dtype=bool)
+    flagged = np.flatnonzero(matrix.any(axis=1))
+
+    flagged_ids, flagged_counts = np.unique(employees[flagged], return_counts=True)
+
+    rule_names = list(flags)
+    violations = [
+        {
+            "employee_id": data["employee_id"][i],
+            "name": data["name"][i],
+            "department": data["department"][i],
+            "date": data["date"][i],
+            "start_time": _minutes_to_time(int(start[i])),
+            "end_time": _minutes_to_time(int(end[i])),
+            "issues": [rule_names[j] for j in np.flatnonzero(matrix[i])]
+        }
+        for i in flagged
+    ]
+
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "rules": rules,
+        "rows_checked": int(len(start)),
+        "rows_flagged": int(len(flagged)),
+        "counts": {name: int(mask.sum()) for name, mask in flags.items()},
+        "by_employee": {int(e): int(c) for e, c in zip(flagged_ids, flagged_counts)},
+        "violations": violations
+    }
+
+
+def format_compliance(result, limit=10):
+    """
+    Human-friendly summary of a compliance result.
+    """
+    lines = [
+        f"🛡️ Compliance check ({result['start_date']} – {result['end_date']})",
+        f"Days checked: {result['rows_checked']}, flagged: {result['rows_flagged']}"
+    ]
+
+    for name, count in result["counts"].items():
+        lines.append(f"- {RULE_LABELS[name]}: {count}")
+
+    for v in result["violations"][:limit]:
+        issues = ", ".join(RULE_LABELS[i] for i in v["issues"])
+        lines.append(
+            f"⚠️ {v['name']} (ID {v['employee_id']}) on {v['date']} "
+            f"{v['start_time']}–{v['end_time']}: {issues}"
+        )
+
+    remaining = len(result["violations"]) - limit
+    if remaining > 0:
+        lines.append(f"... and {remaining} more.")
+
+    return "\n".join(lines)
+
+
+# --------------------------------------------------
+# Batch command
+# --------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Check attendance against HR policy rules.")
+    parser.add_argument("--from", dest="start_date", required=True, help="YYYY-MM-DD")
+    parser.add_argument("--to", dest="end_date", required=True, help="YYYY-MM-DD")
+    parser.add_argument("--department", default=None)
+    parser.add_argument("--employee-id", type=int, default=None)
+    parser.add_argument("--rules", default=None, help="Path to a JSON rules file")
+    parser.add_argument("--output", default=None, help="Write full results as JSON")
+    args = parser.parse_args()
+
+    result = check_compliance(
+        args.start_date,
+        args.end_date,
+        employee_id=args.employee_id,
+        department=args.department,
+        rules=load_rules(args.rules)
+    )
+
+    print(format_compliance(result))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
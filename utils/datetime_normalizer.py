@@ -0,0 +1,172 @@
+# utils/datetime_normalizer.py
+# Converts natural-language dates and times to ISO dates / HH:MM locally
+# ("yesterday", "next monday", "12/01", "5 jan", "9am", "6 pm", "noon")
+# Used by the intent parser and by follow-up validation, so values are
+# stored consistently without another LLM round trip.
+
+import calendar
+import os
+import re
+from datetime import date, datetime, timedelta
+
+# "12/01" is 12 January unless HR_DATE_MONTH_FIRST=1 (then 1 December)
+MONTH_FIRST = os.environ.get("HR_DATE_MONTH_FIRST", "") == "1"
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+MONTHS = [m.lower() for m in calendar.month_name[1:]]
+
+RELATIVE_DAYS = {
+    "today": 0,
+    "tomorrow": 1,
+    "yesterday": -1,
+    "day after tomorrow": 2,
+    "day before yesterday": -2
+}
+
+_WEEKDAY = "|".join(d[:3] + "(?:" + d[3:] + ")?" for d in WEEKDAYS).replace("(?:)?", "")
+_MONTH = "|".join(m[:3] + "(?:" + m[3:] + ")?" for m in MONTHS).replace("(?:)?", "")
+
+_ISO_RE = re.compile(r"^(\d{4})-(\d{1,2})-(\d{1,2})$")
+_NUMERIC_RE = re.compile(r"^(\d{1,2})[/.-](\d{1,2})(?:[/.-](\d{2}|\d{4}))?$")
+_WEEKDAY_RE = re.compile(rf"^(?:(next|this|last|coming)\s+)?({_WEEKDAY})$")
+_DAY_MONTH_RE = re.compile(rf"^(\d{{1,2}})(?:st|nd|rd|th)?\s+(?:of\s+)?({_MONTH})\.?(?:,?\s+(\d{{4}}))?$")
+_MONTH_DAY_RE = re.compile(rf"^({_MONTH})\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?(?:,?\s+(\d{{4}}))?$")
+_TIME_RE = re.compile(r"^(\d{1,2})(?:[:.h](\d{2}))?\s*([ap]\.?m\.?)?$")
+
+# Date expressions that can appear inside a longer sentence
+DATE_IN_TEXT_RE = re.compile(
+    r"\b(?:"
+    r"\d{4}-\d{1,2}-\d{1,2}"
+    r"|\d{1,2}/\d{1,2}(?:/\d{2,4})?"
+    r"|day after tomorrow|day before yesterday|today|tomorrow|yesterday"
+    rf"|(?:(?:next|this|last|coming)\s+)?(?:{'|'.join(WEEKDAYS)})"
+    rf"|\d{{1,2}}(?:st|nd|rd|th)?\s+(?:of\s+)?(?:{_MONTH})(?:,?\s+\d{{4}})?"
+    rf"|(?:{_MONTH})\s+\d{{1,2}}(?:st|nd|rd|th)?(?:,?\s+\d{{4}})?"
+    r")\b"
+)
+
+# Times that can appear inside a longer sentence ("9am", "6:30 pm", "18:00")
+TIME_IN_TEXT_RE = re.compile(
+    r"\b(?:\d{1,2}(?::\d{2})?\s*[ap]\.?m\b\.?|\d{1,2}:\d{2}\b|noon\b|midnight\b)"
+)
+
+
+def _clean(value):
+    return " ".join(str(value).lower().strip().rstrip(".").split())
+
+
+def _build_date(year, month, day, original):
+    try:
+        return date(year, month, day).isoformat()
+    except ValueError:
+        raise ValueError(f"Date '{original}' is not a valid calendar date.")
+
+
+def _weekday_date(qualifier, name, today):
+    """
+    "monday" / "this monday" -> the coming one (today included),
+    "next monday" -> the one after this week's, "last monday" -> the previous one.
+    """
+    target = [d[:3] for d in WEEKDAYS].index(name[:3])
+    delta = (target - today.weekday()) % 7
+
+    if qualifier == "next":
+        monday = today - timedelta(days=today.weekday()) + timedelta(days=7)
+        return monday + timedelta(days=target)
+    if qualifier == "last":
+        return today - timedelta(days=(today.weekday() - target) % 7 or 7)
+
+    return today + timedelta(days=delta)
+
+
+def _month_index(name):
+    return [m[:3] for m in MONTHS].index(name[:3]) + 1
+
+
+def normalize_date(value, today=None):
+    """
+    Natural-language date -> "YYYY-MM-DD".
+    Raises ValueError when the value is not a recognised date.
+    """
+    text = _clean(value)
+    today = today or datetime.now().date()
+
+    if text in RELATIVE_DAYS:
+        return (today + timedelta(days=RELATIVE_DAYS[text])).isoformat()
+
+    match = _ISO_RE.match(text)
+    if match:
+        year, month, day = (int(g) for g in match.groups())
+        return _build_date(year, month, day, value)
+
+    match = _NUMERIC_RE.match(text)
+    if match:
+        first, second, year = match.groups()
+        day, month = (int(second), int(first)) if MONTH_FIRST else (int(first), int(second))
+        year = int(year) if year else today.year
+        if year < 100:
+            year += 2000
+        return _build_date(year, month, day, value)
+
+    match = _WEEKDAY_RE.match(text)
+    if match:
+        return _weekday_date(match.group(1), match.group(2), today).isoformat()
+
+    match = _DAY_MONTH_RE.match(text)
+    if match:
+        day, month, year = match.groups()
+        return _build_date(int(year or today.year), _month_index(month), int(day), value)
+
+    match = _MONTH_DAY_RE.match(text)
+    if match:
+        month, day, year = match.groups()
+        return _build_date(int(year or today.year), _month_index(month), int(day), value)
+
+    raise ValueError(f"Date '{value}' must be a date like YYYY-MM-DD, 'tomorrow' or 'next monday'.")
+
+
+def normalize_time(value):
+    """
+    "9am" / "6 pm" / "9:5" / "18.30" / "noon" -> "HH:MM".
+    Raises ValueError when the value is not a recognised time.
+    """
+    text = _clean(value)
+
+    if text in ("noon", "midday"):
+        return "12:00"
+    if text == "midnight":
+        return "00:00"
+
+    match = _TIME_RE.match(text.replace(" o'clock", ""))
+    if not match:
+        # "9:5" style (single digit minutes)
+        match = re.match(r"^(\d{1,2}):(\d)()$", text)
+    if not match:
+        raise ValueError(f"Time '{value}' must be in HH:MM format (or like 9am).")
+
+    hours = int(match.group(1))
+    minutes = int(match.group(2) or 0)
+    meridiem = (match.group(3) or "").replace(".", "")
+
+    if meridiem:
+        if not 1 <= hours <= 12:
+            raise ValueError(f"Time '{value}' must be in HH:MM format (or like 9am).")
+        hours = hours % 12 + (12 if meridiem == "pm" else 0)
+
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        raise ValueError(f"Time '{value}' must be in HH:MM format (or like 9am).")
+
+    return f"{hours:02d}:{minutes:02d}"
+
+
+def find_date(text, today=None):
+    """
+    First date expression found in free text, normalised, or None.
+    """
+    for match in DATE_IN_TEXT_RE.finditer(_clean(text)):
+        try:
+            return normalize_date(match.group(0), today=today)
+        except ValueError:
+            continue
+
+    return None
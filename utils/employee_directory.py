@@ -0,0 +1,69 @@
+# utils/employee_directory.py
+# Streaming employee directory listing (CSV / JSONL)
+# Employees are read with keyset pagination and written page by page,
+# so memory stays constant however large the company is.
+
+import argparse
+import csv
+import json
+import sys
+
+from db.database import iter_employee_pages
+
+
+DIRECTORY_COLUMNS = ["employee_id", "name", "email", "department"]
+
+SUPPORTED_FORMATS = ["csv", "jsonl"]
+
+
+def write_directory(out, fmt="csv", department=None, page_size=1000):
+    """
+    Write the directory (or one department) to an open text file.
+    Returns the number of employees written.
+    """
+    if fmt not in SUPPORTED_FORMATS:
+        raise ValueError(f"Unsupported format '{fmt}'. Use one of: {', '.join(SUPPORTED_FORMATS)}.")
+
+    writer = None
+    if fmt == "csv":
+        writer = csv.DictWriter(out, fieldnames=DIRECTORY_COLUMNS)
+        writer.writeheader()
+
+    count = 0
+    for page in iter_employee_pages(department=department, page_size=page_size):
+        if writer is not None:
+            writer.writerows(page)
+        else:
+            out.writelines(json.dumps(row, ensure_ascii=False) + "\n" for row in page)
+
+        # Hand each page to the reader as soon as it is written
+        out.flush()
+        count += len(page)
+
+    return count
+
+
+# --------------------------------------------------
+# Batch command
+# --------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="List employees (streamed, page by page).")
+    parser.add_argument("output", nargs="?", default="-", help="Output file path (default: stdout)")
+    parser.add_argument("--format", choices=SUPPORTED_FORMATS, default="csv")
+    parser.add_argument("--department", default=None)
+    parser.add_argument("--page-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    if args.output == "-":
+        write_directory(sys.stdout, args.format, args.department, args.page_size)
+        return
+
+    with open(args.output, "w", newline="", encoding="utf-8") as out:
+        count = write_directory(out, args.format, args.department, args.page_size)
+
+    print(f"Employee directory written to {args.output} ({count} employees)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,157 @@
 # utils/entity_normalizer.py
 # Resolves employee identity safely before DB operations
 # Handles ambiguity, duplicates, and missing identifiers
+# Lookups go to an in-memory index (id, name, email, department,
+# name tokens) built at startup and kept current on writes.
 
-from db.database import (
-    get_employee_by_id,
-    get_employee_by_name
-)
+import threading
+import time
+
+from db.database import get_employees_after
+
+# Catch up with employees added by other processes at most this often
+# (a lookup that finds nothing always catches up first)
+REFRESH_SECONDS = 5.0
+
+
+def _tokens(name):
+    return set(name.lower().split())
+
+
+class EmployeeIndex:
+    """
+    In-memory employee lookup tables.
+    Employees are only ever added, so catching up means loading
+    the rows with an id above the highest one already indexed.
+    """
+
+    def __init__(self):
+        self.by_id = {}
+        self.by_name = {}
+        self.by_email = {}
+        self.by_token = {}
+        self.last_id = 0
+        self.loaded = False
+        self.refreshed_at = 0.0
+        self._lock = threading.Lock()
+
+    # -------------------------
+    # Building / updating
+    # -------------------------
+    def load(self):
+        with self._lock:
+            self._catch_up()
+            self.loaded = True
+
+    def refresh(self):
+        """
+        Index employees added since the last load.
+        Returns True when new employees were found.
+        """
+        with self._lock:
+            return self._catch_up() > 0
+
+    def _catch_up(self):
+        employees = get_employees_after(self.last_id)
+        for employee in employees:
+            self._add(employee)
+        self.refreshed_at = time.monotonic()
+        return len(employees)
+
+    def add(self, employee):
+        """
+        Index an employee written by this process.
+        """
+        with self._lock:
+            self._add(employee)
+
+    def _add(self, employee):
+        employee_id = employee["employee_id"]
+        name = employee["name"].lower()
+
+        self.by_id[employee_id] = employee
+        self.by_name.setdefault(name, set()).add(employee_id)
+        self.by_email[employee["email"].lower()] = employee_id
+        for token in _tokens(name):
+            self.by_token.setdefault(token, set()).add(employee_id)
+
+        self.last_id = max(self.last_id, employee_id)
+
+    # -------------------------
+    # Lookup
+    # -------------------------
+    def search(self, employee_id=None, name=None, email=None, department=None):
+        """
+        Candidates ranked by how well they match all supplied fields.
+        """
+        if not self.loaded:
+            self.load()
+        elif time.monotonic() - self.refreshed_at > REFRESH_SECONDS:
+            self.refresh()
+
+        candidates = self._search(employee_id, name, email, department)
+
+        if not candidates and self.refresh():
+            candidates = self._search(employee_id, name, email, department)
+
+        return candidates
+
+    def search_many(self, queries):
+        """
+        search() for many (employee_id, name, email, department) tuples,
+        with at most one catch-up for all of them.
+        """
+        if not self.loaded:
+            self.load()
+        elif time.monotonic() - self.refreshed_at > REFRESH_SECONDS:
+            self.refresh()
+
+        results = [self._search(*query) for query in queries]
+
+        if not all(results) and self.refresh():
+            results = [r or self._search(*q) for q, r in zip(queries, results)]
+
+        return results
+
+    def _search(self, employee_id, name, email, department):
+        # Name similarity per candidate id
+        scores = {}
+
+        if employee_id is not None:
+            if employee_id in self.by_id:
+                scores[employee_id] = 1.0
+        elif email and email.lower() in self.by_email:
+            scores[self.by_email[email.lower()]] = 1.0
+        elif name:
+            exact = self.by_name.get(name.lower().strip())
+            if exact:
+                scores = dict.fromkeys(list(exact), 1.0)
+            else:
+                # Partial name ("Ann" -> "Ann Lee"): names containing every
+                # token given, ranked by the share of the name matched
+                query = _tokens(name)
+                ids = [set(self.by_token.get(token, ())) for token in query]
+                for eid in set.intersection(*ids) if ids else ():
+                    scores[eid] = len(query) / len(_tokens(self.by_id[eid]["name"]))
+
+        candidates = [{**self.by_id[eid], "score": round(s, 3)} for eid, s in scores.items()]
+
+        # Narrow by the other fields the user gave, when they match anyone
+        for field, value in [("department", department), ("email", email)]:
+            if not value or len(candidates) < 2:
+                continue
+            narrowed = [c for c in candidates if c[field].lower() == value.strip().lower()]
+            if narrowed:
+                for c in narrowed:
+                    c["score"] += 1
+                candidates = narrowed
+
+        candidates.sort(key=lambda c: (-c["score"], c["employee_id"]))
+        return candidates
+
+
+# Shared by all agents of this process
+employee_index = EmployeeIndex()
 
 
 def normalize_employee(data: dict):
@@ -13,13 +159,14 @@ def normalize_employee(data: dict):
     Resolve employee from provided data.
     Priority:
     1. employee_id
-    2. name
+    2. email
+    3. name (narrowed by department / email when ambiguous)
     """
 
-    # -------------------------
-    # Case 1: employee_id provided
-    # -------------------------
     employee_id = data.get("employee_id")
+    name = data.get("name")
+    email = data.get("email")
+
     if employee_id:
         try:
             employee_id = int(employee_id)
@@ -29,53 +176,95 @@ def normalize_employee(data: dict):
                 "message": "Employee ID must be a number."
             }
 
-        employee = get_employee_by_id(employee_id)
-        if not employee:
-            return {
-                "status": "error",
-                "message": f"No employee found with ID {employee_id}."
-            }
+    # -------------------------
+    # Nothing usable provided
+    # -------------------------
+    if not employee_id and not name and not email:
+        return {
+            "status": "error",
+            "message": "Please specify employee name or employee ID."
+        }
+
+    candidates = employee_index.search(
+        employee_id=employee_id or None,
+        name=name,
+        email=email,
+        department=data.get("department")
+    )
 
+    if not candidates:
+        if employee_id:
+            message = f"No employee found with ID {employee_id}."
+        elif name:
+            message = f"No employee found with name '{name}'."
+        else:
+            message = f"No employee found with email '{email}'."
+        return {
+            "status": "error",
+            "message": message
+        }
+
+    if len(candidates) == 1:
+        employee = {k: v for k, v in candidates[0].items() if k != "score"}
         return {
             "status": "resolved",
             "employee": employee
         }
 
     # -------------------------
-    # Case 2: name provided
+    # Ambiguous (multiple employees)
     # -------------------------
-    name = data.get("name")
-    if name:
-        employees = get_employee_by_name(name)
+    return {
+        "status": "ambiguous",
+        "message": (
+            f"There are {len(candidates)} employees matching '{name}'.\n"
+            "Please specify one using employee ID, email, or department."
+        ),
+        "candidates": candidates
+    }
 
-        if not employees:
-            return {
-                "status": "error",
-                "message": f"No employee found with name '{name}'."
-            }
 
-        if len(employees) == 1:
-            return {
-                "status": "resolved",
-                "employee": employees[0]
-            }
+def _identifier_query(identifier):
+    """
+    42 / "42" -> id, "a@x.com" -> email, other text -> name,
+    dict -> its employee_id / name / email / department.
+    """
+    if isinstance(identifier, dict):
+        employee_id = identifier.get("employee_id")
+        return (
+            int(employee_id) if employee_id and str(employee_id).strip().isdigit() else None,
+            identifier.get("name"),
+            identifier.get("email"),
+            identifier.get("department")
+        )
 
-        # -------------------------
-        # Ambiguous (multiple employees)
-        # -------------------------
-        return {
-            "status": "ambiguous",
-            "message": (
-                f"There are {len(employees)} employees named '{name}'.\n"
-                "Please specify one using employee ID, email, or department."
-            ),
-            "candidates": employees
-        }
+    text = str(identifier).strip()
 
-    # -------------------------
-    # Nothing usable provided
-    # -------------------------
-    return {
-        "status": "error",
-        "message": "Please specify employee name or employee ID."
-    }
\ No newline at end of file
+    if text.isdigit():
+        return int(text), None, None, None
+    if "@" in text:
+        return None, None, text, None
+    return None, text, None, None
+
+
+def normalize_employees(identifiers):
+    """
+    Resolve many employee identifiers (ids, emails, names or dicts)
+    at once. Returns one result per input, in input order, with
+    status resolved / ambiguous / missing.
+    """
+    queries = [_identifier_query(identifier) for identifier in identifiers]
+    results = []
+
+    for identifier, query, candidates in zip(
+        identifiers, queries, employee_index.search_many(queries)
+    ):
+        if not any(query[:3]) or not candidates:
+            results.append({"input": identifier, "status": "missing"})
+        elif len(candidates) == 1:
+            employee = {k: v for k, v in candidates[0].items() if k != "score"}
+            results.append({"input": identifier, "status": "resolved", "employee": employee})
+        else:
+            results.append({"input": identifier, "status": "ambiguous", "candidates": candidates})
+
+    return results
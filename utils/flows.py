@@ -0,0 +1,132 @@
+# utils/flows.py
+# Declarative conversation flows for the Orchestrator
+# A Flow lists the fields an intent needs, how to validate them,
+# how to ask for missing ones and which action runs once complete.
+
+from utils.datetime_normalizer import normalize_date, normalize_time
+
+
+class Flow:
+    """
+    Flow describes one intent:
+    - required:     fields that must all be present
+    - any_of:       alternative fields, at least one must be present
+    - validators:   field -> callable(value) returning the cleaned value,
+                    raising ValueError(message) when the value is invalid
+    - prompt:       header listing all missing fields, or a dict of
+                    field -> question asked for the next missing field
+    - multi_value:  follow-up answers are comma separated and fill
+                    the missing fields in order
+    - action:       callable(data) run when the flow is complete
+    - reply:        static reply (no state, no action)
+    """
+
+    def __init__(self, intent, required=(), any_of=(), validators=None, prompt=None,
+                 multi_value=False, action=None, reply=None):
+        self.intent = intent
+        self.required = list(required)
+        self.any_of = list(any_of)
+        self.validators = validators or {}
+        self.prompt = prompt
+        self.multi_value = multi_value
+        self.action = action
+        self.reply = reply
+
+    # -------------------------
+    # Field handling
+    # -------------------------
+    def missing_fields(self, data):
+        missing = [f for f in self.required if not data.get(f)]
+
+        if self.any_of and not any(data.get(f) for f in self.any_of):
+            missing.append(self.any_of[0])
+
+        return missing
+
+    def merge(self, data, values):
+        """
+        Validate and merge non-empty values into data.
+        Returns the validation error message per invalid field.
+        """
+        errors = {}
+
+        for field, value in values.items():
+            if not value:
+                continue
+
+            validator = self.validators.get(field)
+            if validator:
+                try:
+                    value = validator(value)
+                except ValueError as e:
+                    errors[field] = str(e)
+                    continue
+
+            data[field] = value
+
+        return errors
+
+    def followup_values(self, data, expected_field, user_input):
+        """
+        Map a follow-up answer onto the field(s) it fills.
+        """
+        value = user_input.strip()
+
+        # Answer to an "either/or" question: first alternative that accepts it
+        if expected_field in self.any_of:
+            for field in self.any_of:
+                validator = self.validators.get(field)
+                if validator is None:
+                    return {field: value}
+                try:
+                    validator(value)
+                    return {field: value}
+                except ValueError:
+                    continue
+
+        if not self.multi_value:
+            return {expected_field: value}
+
+        values = [v.strip() for v in user_input.split(",") if v.strip()]
+        return dict(zip(self.missing_fields(data), values))
+
+    def ask(self, missing):
+        """
+        Question for the missing fields.
+        """
+        if isinstance(self.prompt, dict):
+            return self.prompt[missing[0]]
+
+        labels = [
+            " or ".join(self.any_of) if self.any_of and field == self.any_of[0] else field
+            for field in missing
+        ]
+        missing_text = "\n".join(f"- {label}" for label in labels)
+        return f"{self.prompt}\n{missing_text}"
+
+
+# --------------------------------------------------
+# Common validators
+# --------------------------------------------------
+
+def validate_employee_id(value):
+    value = str(value).strip()
+
+    if not value.isdigit():
+        raise ValueError("Employee ID must be a number.")
+
+    return value
+
+
+def validate_time(value):
+    """
+    "9:5" / "09:05" / "9am" / "6 pm" -> "HH:MM".
+    """
+    return normalize_time(value)
+
+
+def validate_date(value):
+    """
+    "2026-01-05" / "yesterday" / "next monday" / "12/01" -> "YYYY-MM-DD".
+    """
+    return normalize_date(value)
@@ -0,0 +1,271 @@
+# utils/intent_cache.py
+# Semantic cache for LLM intent parses
+# Utterances are embedded with their entities masked ("show working hours
+# of <number> <date>"), so paraphrases of a past request map to the same
+# intent template. On a hit the template is filled with entities
+# extracted locally from the new utterance and the LLM call is skipped.
+
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import faiss
+import numpy as np
+
+from utils import metrics
+from utils.model_registry import DEFAULT_MODEL, get_model
+from utils.datetime_normalizer import (
+    DATE_IN_TEXT_RE,
+    TIME_IN_TEXT_RE,
+    normalize_date,
+    normalize_time
+)
+
+# HR_INTENT_CACHE=0 disables the cache
+ENABLED = os.environ.get("HR_INTENT_CACHE", "1") != "0"
+
+# Cosine similarity of masked utterances needed for a hit
+SIMILARITY_THRESHOLD = float(os.environ.get("HR_INTENT_CACHE_THRESHOLD", "0.92"))
+
+# Least recently used templates are evicted beyond this
+MAX_ENTRIES = int(os.environ.get("HR_INTENT_CACHE_SIZE", "1000"))
+
+# Fields a template may use: all of them can be re-extracted locally
+DATE_FIELDS = ["date", "start_date", "end_date"]
+TIME_FIELDS = ["start_time", "end_time"]
+LOCAL_FIELDS = {"employee_id", "email", "query", *DATE_FIELDS, *TIME_FIELDS}
+
+_EMAIL_RE = re.compile(r"\b[\w.+-]+@[\w-]+(?:\.[\w-]+)+\b")
+_NUMBER_RE = re.compile(r"\b\d+\b")
+
+
+# --------------------------------------------------
+# Entity masking / extraction
+# --------------------------------------------------
+
+def mask_entities(user_input):
+    """
+    (masked text, entities) where entities holds the emails, ISO dates,
+    HH:MM times and numbers found, in order of appearance.
+    """
+    text = " ".join(user_input.lower().split())
+    entities = {"email": [], "date": [], "time": [], "number": []}
+
+    def replace(kind, normalize):
+        def _sub(match):
+            try:
+                entities[kind].append(normalize(match.group(0)))
+            except ValueError:
+                return match.group(0)
+            return f"<{kind}>"
+        return _sub
+
+    text = _EMAIL_RE.sub(replace("email", str), text)
+    text = DATE_IN_TEXT_RE.sub(replace("date", normalize_date), text)
+    text = TIME_IN_TEXT_RE.sub(replace("time", normalize_time), text)
+    text = _NUMBER_RE.sub(replace("number", str), text)
+
+    return text, entities
+
+
+def _fill_template(template, entities, user_input):
+    """
+    Template fields filled from locally extracted entities,
+    or None when the utterance lacks an entity the template needs.
+    """
+    intent, fields = template
+    parsed = {"intent": intent}
+
+    for field_list, values in [(DATE_FIELDS, entities["date"]), (TIME_FIELDS, entities["time"])]:
+        needed = [f for f in field_list if f in fields]
+        if len(values) < len(needed):
+            return None
+        parsed.update(zip(needed, values))
+
+    for field, values in [("employee_id", entities["number"]), ("email", entities["email"])]:
+        if field in fields:
+            if not values:
+                return None
+            parsed[field] = values[0]
+
+    if "query" in fields:
+        parsed["query"] = user_input
+
+    return parsed
+
+
+def _comparable(field, value):
+    value = str(value).strip()
+    try:
+        if field in DATE_FIELDS:
+            return normalize_date(value)
+        if field in TIME_FIELDS:
+            return normalize_time(value)
+    except ValueError:
+        return value
+    return value.lower()
+
+
+# --------------------------------------------------
+# Cache
+# --------------------------------------------------
+
+class SemanticIntentCache:
+    """
+    Masked-utterance embeddings in a FAISS inner-product index
+    (normalised vectors, so scores are cosine similarities),
+    with an LRU of intent templates keyed by FAISS id.
+    """
+
+    def __init__(self, threshold=SIMILARITY_THRESHOLD, max_entries=MAX_ENTRIES):
+        self.enabled = ENABLED
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.model = None
+        self.index = None
+        self.templates = OrderedDict()
+        self.next_id = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _encode(self, text):
+        """
+        Embed text. Runs outside self._lock, so concurrent lookups
+        reach the shared model together and are micro-batched.
+        """
+        if self.index is None:
+            with self._lock:
+                if self.index is None:
+                    try:
+                        self.model = get_model(DEFAULT_MODEL)
+                    except Exception:
+                        # Without the embedding model the cache stays off
+                        self.enabled = False
+                        raise
+                    self.index = faiss.IndexIDMap2(
+                        faiss.IndexFlatIP(self.model.get_sentence_embedding_dimension())
+                    )
+
+        with metrics.span("intent_cache.encode"):
+            vector = self.model.encode([text], normalize_embeddings=True)
+        return np.asarray(vector, dtype="float32")
+
+    def _nearest(self, vector):
+        if not self.templates:
+            return None, 0.0
+
+        scores, ids = self.index.search(vector, 1)
+        if ids[0][0] < 0:
+            return None, 0.0
+        return int(ids[0][0]), float(scores[0][0])
+
+    def _record(self, hit):
+        if hit:
+            self.hits += 1
+            metrics.inc("intent_cache.hits")
+        else:
+            self.misses += 1
+            metrics.inc("intent_cache.misses")
+
+        metrics.set_gauge("intent_cache.hit_rate", self.hits / (self.hits + self.misses))
+
+    # -------------------------
+    # Lookup / store
+    # -------------------------
+    def lookup(self, user_input, hint=None):
+        """
+        Parsed intent for a near-duplicate of a past utterance, or None.
+        """
+        if not self.enabled:
+            return None
+
+        masked, entities = mask_entities(user_input)
+        vector = self._encode(masked)
+
+        # Only the index search and LRU update are serialised
+        with self._lock:
+            entry_id, score = self._nearest(vector)
+
+            parsed = None
+            if entry_id is not None and score >= self.threshold:
+                template = self.templates[entry_id]
+                # The rule-based hint wins over the template's intent
+                if not hint or hint == template[0]:
+                    parsed = _fill_template(template, entities, user_input)
+                    if parsed is not None:
+                        self.templates.move_to_end(entry_id)
+
+            self._record(parsed is not None)
+
+        return parsed
+
+    def store(self, user_input, parsed):
+        """
+        Remember the intent template of an LLM parse, when every entity
+        it used can be re-extracted locally from the utterance.
+        """
+        if not self.enabled:
+            return False
+
+        intent = parsed.get("intent")
+        fields = frozenset(
+            f for f, v in parsed.items()
+            if f != "intent" and v not in (None, "", [])
+        )
+
+        if not intent or intent == "unknown" or not fields <= LOCAL_FIELDS:
+            return False
+
+        masked, entities = mask_entities(user_input)
+        template = (intent, fields)
+
+        # Only keep templates local extraction reproduces exactly
+        filled = _fill_template(template, entities, user_input)
+        if filled is None or any(
+            _comparable(f, filled[f]) != _comparable(f, parsed[f])
+            for f in fields if f != "query"
+        ):
+            return False
+
+        vector = self._encode(masked)
+
+        with self._lock:
+            entry_id, score = self._nearest(vector)
+
+            if entry_id is not None and score >= self.threshold:
+                self.templates[entry_id] = template
+                self.templates.move_to_end(entry_id)
+                return True
+
+            self.index.add_with_ids(vector, np.array([self.next_id], dtype="int64"))
+            self.templates[self.next_id] = template
+            self.next_id += 1
+
+            while len(self.templates) > self.max_entries:
+                evicted, _ = self.templates.popitem(last=False)
+                self.index.remove_ids(np.array([evicted], dtype="int64"))
+                metrics.inc("intent_cache.evictions")
+
+            metrics.set_gauge("intent_cache.size", len(self.templates))
+
+        return True
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self.templates),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0
+        }
+
+    def clear(self):
+        with self._lock:
+            if self.index is not None:
+                self.index.reset()
+            self.templates.clear()
+
+
+intent_cache = SemanticIntentCache()
@@ -2,9 +2,16 @@
 # Converts raw user text into a SAFE, STRUCTURED intent
 # HR-driven attendance model (NO auto time)
 
+import calendar
 import json
-from datetime import datetime
-from utils.ai_client import call_ollama
+import re
+import time
+from datetime import datetime, timedelta
+from utils import metrics
+from utils.ai_client import call_ollama, stream_ollama
+from utils.datetime_normalizer import find_date, normalize_date, normalize_time
+from utils.intent_cache import intent_cache
+from utils.llm_scheduler import INTERACTIVE, LLMOverloaded, llm_scheduler
 
 
 # --------------------------------------------------
@@ -18,8 +25,12 @@ INTENT_SCHEMA = {
     "email": None,
     "department": None,
     "date": None,
+    "start_date": None,
+    "end_date": None,
     "start_time": None,
     "end_time": None,
+    "weekdays": None,
+    "leave_type": None,
     "query": None
 }
 
@@ -42,17 +53,28 @@ Schema:
   "email": null,
   "department": null,
   "date": null,
+  "start_date": null,
+  "end_date": null,
   "start_time": null,
   "end_time": null,
+  "weekdays": null,
+  "leave_type": null,
   "query": null
 }
 
 Valid intents:
 register_employee
 find_employee
+list_employees
 assign_working_hours
+bulk_assign_working_hours
+assign_shift_template
 attendance_info
 daily_report
+hours_summary
+compliance_check
+apply_leave
+leave_balance
 hr_policy
 """
 
@@ -60,8 +82,62 @@ hr_policy
 # Helpers
 # --------------------------------------------------
 
-def _today_date():
-    return datetime.now().strftime("%Y-%m-%d")
+def _week_period(user_input):
+    """
+    Resolve "this week" / "next week" to (monday, sunday) dates.
+    """
+    text = user_input.lower()
+    today = datetime.now().date()
+    monday = today - timedelta(days=today.weekday())
+
+    if "next week" in text:
+        monday += timedelta(days=7)
+    elif "this week" not in text:
+        return None, None
+
+    return monday.strftime("%Y-%m-%d"), (monday + timedelta(days=6)).strftime("%Y-%m-%d")
+
+
+MONTH_NAMES = [m.lower() for m in calendar.month_name[1:]]
+
+
+def _month_period(user_input):
+    """
+    Resolve "this month" / "last month" / "<month name> [year]"
+    to (first day, last day) dates.
+    """
+    text = user_input.lower()
+    today = datetime.now().date()
+    year, month = today.year, None
+
+    if "this month" in text:
+        month = today.month
+    elif "last month" in text:
+        year, month = (year, today.month - 1) if today.month > 1 else (year - 1, 12)
+    else:
+        for i, name in enumerate(MONTH_NAMES, start=1):
+            if name in text or f" {name[:3]} " in f" {text} ":
+                month = i
+                break
+
+        if month is None:
+            return None, None
+
+        for token in text.replace(",", " ").split():
+            if token.isdigit() and len(token) == 4:
+                year = int(token)
+
+    last_day = calendar.monthrange(year, month)[1]
+    return f"{year:04d}-{month:02d}-01", f"{year:04d}-{month:02d}-{last_day:02d}"
+
+
+# "employees in IT", "staff of the sales department"
+_DEPARTMENT_RE = re.compile(
+    r"\b(?:in|of|from)\s+(?:the\s+)?([a-z][\w&-]*)(?:\s+(?:department|dept|team))?\b"
+)
+
+# Directory page cursor: "... after 120" / "after id 120"
+_AFTER_ID_RE = re.compile(r"\bafter\s+(?:employee\s+)?(?:id\s*)?#?(\d+)\b")
 
 
 def _fallback_intent():
@@ -81,6 +157,99 @@ def _extract_json(text):
     return text[start:end + 1]
 
 
+# A completed top-level scalar field: "key": "value" / null / true / 12
+_FIELD_RE = re.compile(
+    r'"(\w+)"\s*:\s*("(?:[^"\\]|\\.)*"|null|true|false|-?\d+(?:\.\d+)?)\s*(?=[,}])'
+)
+
+
+class IncrementalJSONParser:
+    """
+    Parses a JSON object while it is still streaming in.
+    - fields: scalar fields completed so far (available mid-stream)
+    - done:   the outer object has been closed
+    Text before the first "{" is ignored, like _extract_json.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.fields = {}
+        self.start = None
+        self.end = None
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._field_pos = 0
+
+    @property
+    def done(self):
+        return self.end is not None
+
+    def feed(self, chunk):
+        scanned = len(self.buffer)
+        self.buffer += chunk
+
+        # Track braces over the new characters only (ignoring strings)
+        for i in range(scanned, len(self.buffer)):
+            if self.end is not None:
+                break
+
+            ch = self.buffer[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"' and self.start is not None:
+                self._in_string = True
+            elif ch == "{":
+                if self.start is None:
+                    self.start = i
+                self._depth += 1
+            elif ch == "}" and self.start is not None:
+                self._depth -= 1
+                if self._depth == 0:
+                    self.end = i + 1
+
+        if self.start is not None:
+            for match in _FIELD_RE.finditer(self.buffer, max(self._field_pos, self.start)):
+                self.fields[match.group(1)] = json.loads(match.group(2))
+                self._field_pos = match.end()
+
+        return self.fields
+
+    def result(self):
+        """
+        The complete object, or the fields seen so far if the
+        stream ended early.
+        """
+        if self.end is not None:
+            return json.loads(self.buffer[self.start:self.end])
+        if self.fields:
+            return dict(self.fields)
+        raise ValueError("No JSON found")
+
+
+# Words that make a message a question about the rules, not a request
+# to act on or look up data ("explain the shift policy", "how many
+# casual leaves are allowed per year?")
+POLICY_QUESTION_WORDS = [
+    "policy",
+    "policies",
+    "allowed",
+    "entitle",
+    "eligible",
+    "approval",
+    "rule"
+]
+
+
+def _asks_about_policy(text):
+    return any(word in text for word in POLICY_QUESTION_WORDS)
+
+
 def _rule_based_intent_hint(user_input):
     """
     Light rule-based hints to help local LLM.
@@ -100,6 +269,59 @@ def _rule_based_intent_hint(user_input):
     if "register" in text and "employee" in text:
         return "register_employee"
 
+    # ---------- LEAVE BALANCE ----------
+    if "leave" in text and any(k in text for k in [
+        "balance",
+        "left",
+        "remaining",
+        "how many"
+    ]) and not _asks_about_policy(text):
+        return "leave_balance"
+
+    # ---------- APPLY FOR LEAVE ----------
+    if "leave" in text and any(k in text for k in [
+        "apply",
+        "take",
+        "request",
+        "book"
+    ]) and not _asks_about_policy(text):
+        return "apply_leave"
+
+    # ---------- COMPLIANCE CHECK (policy violations) ----------
+    if any(k in text for k in [
+        "compliance",
+        "violation",
+        "late start",
+        "late arrival",
+        "early leave",
+        "came late",
+        "left early"
+    ]) and not _asks_about_policy(text):
+        return "compliance_check"
+
+    # ---------- HOURS SUMMARY (aggregates) ----------
+    if any(k in text for k in [
+        "total hours",
+        "total working hours",
+        "monthly hours",
+        "hours summary",
+        "average hours",
+        "overtime"
+    ]) and not _asks_about_policy(text):
+        return "hours_summary"
+
+    # ---------- RECURRING SHIFT TEMPLATE ----------
+    if any(k in text for k in ["shift", "template", "recurring", "every week"]) and any(
+        k in text for k in ["assign", "set", "create", "add", "schedule"]
+    ) and not _asks_about_policy(text):
+        return "assign_shift_template"
+
+    # ---------- BULK ASSIGN (whole department) ----------
+    if re.search(r"\ball\b", text) and any(k in text for k in ["employees", "department", "staff"]) and (
+        any(k in text for k in ["assign", "set", "working hours"]) or re.search(r"\b\d{1,2}:\d{2}\b", text)
+    ):
+        return "bulk_assign_working_hours"
+
     # ---------- ASSIGN WORKING HOURS (HR ACTION) ----------
     if any(k in text for k in [
         "start work",
@@ -113,6 +335,17 @@ def _rule_based_intent_hint(user_input):
     ]):
         return "assign_working_hours"
 
+    # ---------- LIST EMPLOYEES (directory) ----------
+    if any(k in text for k in [
+        "list employees",
+        "list all employees",
+        "list staff",
+        "employee directory",
+        "employees in",
+        "who works in"
+    ]):
+        return "list_employees"
+
     # ---------- ATTENDANCE INFO (READ ONLY) ----------
     if any(k in text for k in [
         "attendance record",
@@ -132,7 +365,7 @@ def _rule_based_intent_hint(user_input):
         return "daily_report"
 
     # ---------- HR POLICY ----------
-    if "policy" in text:
+    if _asks_about_policy(text):
         return "hr_policy"
 
     return None
@@ -142,10 +375,59 @@ def _rule_based_intent_hint(user_input):
 # Main function
 # --------------------------------------------------
 
-def parse_intent(user_input):
+# Intents that need no entities: once known, the rest of the
+# streamed response is not needed
+NO_ENTITY_INTENTS = {"greeting", "help"}
+
+
+def _stream_intent(system_prompt, user_input, hint, on_intent):
+    """
+    Stream the LLM response and call on_intent(intent) as soon as the
+    intent is known (from the rule-based hint, or the "intent" field).
+    """
+    started = time.perf_counter()
+
+    def announce(intent):
+        metrics.observe("intent.time_to_first_feedback", time.perf_counter() - started)
+        on_intent(intent)
+
+    if hint:
+        announce(hint)
+        if hint in NO_ENTITY_INTENTS:
+            return {"intent": hint}
+
+    parser = IncrementalJSONParser()
+    chunks = stream_ollama(system_prompt, user_input)
+
+    try:
+        for chunk in chunks:
+            if not parser.buffer:
+                metrics.observe("llm.time_to_first_token", time.perf_counter() - started)
+
+            parser.feed(chunk)
+
+            if not hint and parser.fields.get("intent"):
+                hint = parser.fields["intent"]
+                announce(hint)
+                if hint in NO_ENTITY_INTENTS:
+                    return {"intent": hint}
+
+            if parser.done:
+                break
+    finally:
+        # Stops generation / closes the connection when leaving early
+        chunks.close()
+
+    return parser.result()
+
+
+def parse_intent(user_input, on_intent=None, priority=INTERACTIVE):
     """
     Convert user input text into structured intent.
     HR-driven: no auto time filling.
+    With on_intent, the LLM response is streamed and on_intent(intent)
+    is called as soon as the intent is known, before the entities.
+    priority is the LLM scheduler class (interactive / batch).
     """
 
     hint = _rule_based_intent_hint(user_input)
@@ -154,26 +436,116 @@ def parse_intent(user_input):
     if hint:
         system_prompt += f"\nHint: intent is likely '{hint}'."
 
+    # ---------- Semantic cache (paraphrase of a past request) ----------
+    try:
+        cached = intent_cache.lookup(user_input, hint=hint)
+    except Exception as e:
+        print("⚠️ Intent cache unavailable:", e)
+        cached = None
+
     # ---------- TRY ----------
+    shed = False
     try:
-        raw = call_ollama(system_prompt, user_input)
-        clean = _extract_json(raw)
-        parsed = json.loads(clean)
+        if cached is not None:
+            parsed = cached
+            if on_intent is not None:
+                on_intent(hint or cached["intent"])
+        elif on_intent is None:
+            with llm_scheduler.slot(priority):
+                raw = call_ollama(system_prompt, user_input)
+            clean = _extract_json(raw)
+            parsed = json.loads(clean)
+        else:
+            with llm_scheduler.slot(priority):
+                parsed = _stream_intent(system_prompt, user_input, hint, on_intent)
+    except LLMOverloaded as e:
+        # Load shedding: rule-based intent only, entities are asked for
+        if not hint:
+            print("⚠️", e)
+            return _fallback_intent()
+        parsed = {"intent": hint}
+        shed = True
     except Exception as e:
         print("⚠️ AI intent parsing failed:", e)
         return _fallback_intent()
 
+    if cached is None and not shed:
+        try:
+            intent_cache.store(user_input, parsed)
+        except Exception as e:
+            print("⚠️ Intent cache unavailable:", e)
+
     # ---------- Merge with schema ----------
     intent_data = {**INTENT_SCHEMA, **parsed}
 
-    # ---------- Resolve date ONLY if explicitly today ----------
-    if intent_data["date"] == "today":
-        intent_data["date"] = _today_date()
+    # ---------- Normalise dates / times locally ----------
+    # Unrecognised values are kept as-is; the flow validators re-prompt
+    for field in ["date", "start_date", "end_date"]:
+        if intent_data[field]:
+            try:
+                intent_data[field] = normalize_date(intent_data[field])
+            except ValueError:
+                pass
+
+    for field in ["start_time", "end_time"]:
+        if intent_data[field]:
+            try:
+                intent_data[field] = normalize_time(intent_data[field])
+            except ValueError:
+                pass
+
+    # A date written in the message ("yesterday", "next monday") that the LLM missed
+    if not any(intent_data[f] for f in ["date", "start_date", "end_date"]):
+        intent_data["date"] = find_date(user_input)
 
     # ---------- FINAL INTENT OVERRIDE ----------
     if hint:
         intent_data["intent"] = hint
 
+    # ---------- Resolve period for bulk assignment ----------
+    if intent_data["intent"] == "bulk_assign_working_hours" and not intent_data["start_date"]:
+        start_date, end_date = _week_period(user_input)
+        if start_date:
+            intent_data["start_date"] = start_date
+            intent_data["end_date"] = end_date
+        elif intent_data["date"]:
+            intent_data["start_date"] = intent_data["date"]
+            intent_data["end_date"] = intent_data["date"]
+
+    # ---------- Resolve period for hours summary / compliance ----------
+    if intent_data["intent"] in ("hours_summary", "compliance_check") and not intent_data["start_date"]:
+        start_date, end_date = _month_period(user_input)
+        if start_date:
+            intent_data["start_date"] = start_date
+            intent_data["end_date"] = end_date
+        elif intent_data["date"]:
+            intent_data["start_date"] = intent_data["date"]
+            intent_data["end_date"] = intent_data["date"]
+
+    # ---------- Resolve period and type for leave ----------
+    if intent_data["intent"] == "apply_leave":
+        if not intent_data["start_date"] and intent_data["date"]:
+            intent_data["start_date"] = intent_data["date"]
+        if intent_data["start_date"] and not intent_data["end_date"]:
+            intent_data["end_date"] = intent_data["start_date"]
+        if not intent_data["leave_type"]:
+            text = user_input.lower()
+            if "sick" in text:
+                intent_data["leave_type"] = "sick"
+            elif "casual" in text:
+                intent_data["leave_type"] = "casual"
+
+    # ---------- Department and page cursor for the directory ----------
+    if intent_data["intent"] == "list_employees":
+        text = user_input.lower()
+        if not intent_data["department"]:
+            match = _DEPARTMENT_RE.search(text)
+            if match and match.group(1) not in ("the", "department", "dept", "team"):
+                intent_data["department"] = match.group(1)
+        match = _AFTER_ID_RE.search(text)
+        if match:
+            intent_data["after_id"] = match.group(1)
+
     # ---------- Ensure query for HR policy ----------
     if intent_data["intent"] == "hr_policy" and not intent_data.get("query"):
         intent_data["query"] = user_input
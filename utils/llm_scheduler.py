@@ -0,0 +1,132 @@
+# utils/llm_scheduler.py
+# Priority scheduler in front of the LLM client
+# At most HR_LLM_CONCURRENCY calls reach Ollama at once; waiting callers
+# are served strictly by priority class (interactive > batch), FIFO within
+# a class. Answers to an ongoing flow never reach the LLM, so chat turns
+# are all interactive; batch is for bulk replays. Queues are bounded: batch
+# callers block until there is room (backpressure), interactive callers are
+# shed instead (LLMOverloaded) so the parser can fall back to rule-based intents.
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from utils import metrics
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+
+# Highest priority first
+PRIORITIES = [INTERACTIVE, BATCH]
+
+# Ollama serves one request at a time unless OLLAMA_NUM_PARALLEL is raised
+CONCURRENCY = int(os.environ.get("HR_LLM_CONCURRENCY", "1"))
+
+# Waiting callers allowed per class
+QUEUE_LIMITS = {INTERACTIVE: 16, BATCH: 64}
+
+# Longest queue wait before a call is shed (None = wait as long as needed)
+MAX_WAIT_SECONDS = {INTERACTIVE: 20.0, BATCH: None}
+
+
+class LLMOverloaded(Exception):
+    """
+    Raised when a call is shed because its queue is full or it waited too long.
+    """
+
+
+class LLMScheduler:
+    def __init__(self, concurrency=CONCURRENCY, queue_limits=None, max_wait_seconds=None):
+        self.concurrency = concurrency
+        self.queue_limits = {**QUEUE_LIMITS, **(queue_limits or {})}
+        self.max_wait_seconds = {**MAX_WAIT_SECONDS, **(max_wait_seconds or {})}
+
+        self._cond = threading.Condition()
+        self._queues = {priority: deque() for priority in PRIORITIES}
+        self._running = 0
+
+    # -------------------------
+    # Public API
+    # -------------------------
+    @contextmanager
+    def slot(self, priority=INTERACTIVE):
+        """
+        Hold one LLM slot for the duration of the block
+        (a whole streamed response included).
+        """
+        self._acquire(priority)
+        try:
+            yield
+        finally:
+            self._release()
+
+    def call(self, fn, *args, priority=INTERACTIVE, **kwargs):
+        with self.slot(priority):
+            return fn(*args, **kwargs)
+
+    def depths(self):
+        with self._cond:
+            return {priority: len(queue) for priority, queue in self._queues.items()}
+
+    # -------------------------
+    # Internals
+    # -------------------------
+    def _shed(self, priority, reason):
+        metrics.inc(f"llm.shed.{priority}")
+        raise LLMOverloaded(f"LLM busy ({reason}); {priority} request shed.")
+
+    def _head(self):
+        for priority in PRIORITIES:
+            if self._queues[priority]:
+                return self._queues[priority][0]
+        return None
+
+    def _gauge(self, priority):
+        metrics.set_gauge(f"llm.queue_depth.{priority}", len(self._queues[priority]))
+
+    def _acquire(self, priority):
+        if priority not in self._queues:
+            raise ValueError(f"Unknown priority '{priority}'. Use one of: {', '.join(PRIORITIES)}.")
+
+        started = time.perf_counter()
+        max_wait = self.max_wait_seconds[priority]
+        deadline = None if max_wait is None else time.monotonic() + max_wait
+        queue = self._queues[priority]
+
+        with self._cond:
+            # Bounded queue: batch waits for room, interactive is shed
+            while len(queue) >= self.queue_limits[priority]:
+                if priority != BATCH:
+                    self._shed(priority, "queue full")
+                self._cond.wait()
+
+            ticket = object()
+            queue.append(ticket)
+            self._gauge(priority)
+
+            while not (self._running < self.concurrency and self._head() is ticket):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    queue.remove(ticket)
+                    self._gauge(priority)
+                    self._cond.notify_all()
+                    self._shed(priority, "queue wait too long")
+                self._cond.wait(remaining)
+
+            queue.popleft()
+            self._running += 1
+            self._gauge(priority)
+            self._cond.notify_all()
+
+        metrics.observe(f"llm.queue_wait.{priority}", time.perf_counter() - started)
+
+    def _release(self):
+        with self._cond:
+            self._running -= 1
+            self._cond.notify_all()
+
+
+# Shared by every LLM caller of this process
+llm_scheduler = LLMScheduler()
@@ -0,0 +1,220 @@
+# utils/metrics.py
+# Lightweight in-process metrics: counters, gauges and latency histograms
+# Disabled by default (set HR_METRICS=1 or call enable()); when disabled
+# a timed call costs one flag check.
+#
+# Dump with to_json() or to_prometheus() (Prometheus text format).
+
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+_enabled = os.environ.get("HR_METRICS", "").lower() in ("1", "true", "yes")
+_lock = threading.Lock()
+_counters = {}
+_gauges = {}
+_histograms = {}
+
+
+class Histogram:
+    """
+    Cumulative-bucket latency histogram (seconds).
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def to_dict(self):
+        cumulative = 0
+        buckets = {}
+
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else 0.0,
+            "buckets": buckets
+        }
+
+
+# --------------------------------------------------
+# Switch
+# --------------------------------------------------
+
+def enable(flag=True):
+    global _enabled
+    _enabled = flag
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
+        _histograms.clear()
+
+
+# --------------------------------------------------
+# Recording
+# --------------------------------------------------
+
+def inc(name, value=1):
+    if not _enabled:
+        return
+
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def set_gauge(name, value):
+    if not _enabled:
+        return
+
+    with _lock:
+        _gauges[name] = value
+
+
+def observe(name, seconds):
+    if not _enabled:
+        return
+
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.observe(seconds)
+
+
+@contextmanager
+def span(name):
+    """
+    Time a block of code into histogram `name`.
+    """
+    if not _enabled:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        inc(f"{name}.errors")
+        raise
+    finally:
+        observe(name, time.perf_counter() - start)
+
+
+def timed(name):
+    """
+    Decorator: time every call into histogram `name` and count errors.
+    Generator functions are timed across their whole iteration.
+    """
+
+    def decorator(fn):
+        if inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def gen_wrapper(*args, **kwargs):
+                if not _enabled:
+                    yield from fn(*args, **kwargs)
+                    return
+
+                with span(name):
+                    yield from fn(*args, **kwargs)
+
+            return gen_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            except Exception:
+                inc(f"{name}.errors")
+                raise
+            finally:
+                observe(name, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+# --------------------------------------------------
+# Export
+# --------------------------------------------------
+
+def snapshot():
+    with _lock:
+        return {
+            "counters": dict(_counters),
+            "gauges": dict(_gauges),
+            "histograms": {k: h.to_dict() for k, h in _histograms.items()}
+        }
+
+
+def to_json():
+    return json.dumps(snapshot(), indent=2)
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def to_prometheus():
+    """
+    Render all metrics in the Prometheus text exposition format.
+    """
+    data = snapshot()
+    lines = []
+
+    lines.append("# HELP hr_events_total Event counters by name.")
+    lines.append("# TYPE hr_events_total counter")
+    for name, value in sorted(data["counters"].items()):
+        lines.append(f'hr_events_total{{name="{_label(name)}"}} {value}')
+
+    lines.append("# HELP hr_gauge Point-in-time values by name.")
+    lines.append("# TYPE hr_gauge gauge")
+    for name, value in sorted(data["gauges"].items()):
+        lines.append(f'hr_gauge{{name="{_label(name)}"}} {value}')
+
+    lines.append("# HELP hr_duration_seconds Operation latency by name.")
+    lines.append("# TYPE hr_duration_seconds histogram")
+    for name, hist in sorted(data["histograms"].items()):
+        label = _label(name)
+        for bound, count in hist["buckets"].items():
+            lines.append(f'hr_duration_seconds_bucket{{name="{label}",le="{bound}"}} {count}')
+        lines.append(f'hr_duration_seconds_bucket{{name="{label}",le="+Inf"}} {hist["count"]}')
+        lines.append(f'hr_duration_seconds_sum{{name="{label}"}} {hist["sum"]}')
+        lines.append(f'hr_duration_seconds_count{{name="{label}"}} {hist["count"]}')
+
+    return "\n".join(lines) + "\n"
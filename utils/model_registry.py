@@ -0,0 +1,166 @@
+# utils/model_registry.py
+# Process-wide registry of embedding models
+# Each SentenceTransformer is loaded once and shared by every component
+# (policy vector store, intent cache, ...). Concurrent encode() calls
+# are micro-batched: while one forward pass runs, new requests queue up
+# and the next caller encodes all of them in a single pass.
+
+import threading
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+from utils import metrics
+
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+
+# Most texts encoded in one forward pass
+MAX_BATCH_TEXTS = 64
+
+_models = {}
+_lock = threading.Lock()
+
+
+class _EncodeRequest:
+    def __init__(self, texts):
+        self.texts = texts
+        self.result = None
+        self.error = None
+        self.done = False
+
+
+class SharedEmbeddingModel:
+    """
+    Thread-safe, micro-batching wrapper around one SentenceTransformer.
+    """
+
+    def __init__(self, name, max_batch_texts=MAX_BATCH_TEXTS):
+        self.name = name
+        self.model = SentenceTransformer(name)
+        self.max_batch_texts = max_batch_texts
+
+        self._cond = threading.Condition()
+        self._pending = []
+        self._busy = False
+
+        self.requests = 0
+        self.batches = 0
+
+        metrics.set_gauge(f"embedding.{name}.memory_bytes", self.memory_bytes())
+
+    def get_sentence_embedding_dimension(self):
+        return self.model.get_sentence_embedding_dimension()
+
+    def memory_bytes(self):
+        """
+        Bytes held by the model's parameters and buffers.
+        """
+        tensors = [*self.model.parameters(), *self.model.buffers()]
+        return sum(t.numel() * t.element_size() for t in tensors)
+
+    # -------------------------
+    # Encoding
+    # -------------------------
+    def encode(self, texts, normalize_embeddings=False):
+        """
+        Same contract as SentenceTransformer.encode for a list of texts
+        (float32 array, one row per text).
+        """
+        texts = [texts] if isinstance(texts, str) else list(texts)
+        request = _EncodeRequest(texts)
+
+        with self._cond:
+            self._pending.append(request)
+
+            while not request.done:
+                if self._busy:
+                    self._cond.wait()
+                    continue
+
+                # This caller runs the next batch (which may include
+                # requests queued by other threads)
+                batch = self._take_batch()
+                self._busy = True
+                self._cond.release()
+                try:
+                    self._run(batch)
+                finally:
+                    self._cond.acquire()
+                    self._busy = False
+                    self._cond.notify_all()
+
+        if request.error is not None:
+            raise request.error
+
+        vectors = request.result
+        if normalize_embeddings:
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.where(norms == 0, 1, norms)
+
+        return vectors
+
+    def _take_batch(self):
+        batch, count = [], 0
+
+        while self._pending and (not batch or count + len(self._pending[0].texts) <= self.max_batch_texts):
+            request = self._pending.pop(0)
+            batch.append(request)
+            count += len(request.texts)
+
+        return batch
+
+    def _run(self, batch):
+        texts = [text for request in batch for text in request.texts]
+
+        try:
+            with metrics.span(f"embedding.{self.name}.encode"):
+                vectors = np.asarray(self.model.encode(texts), dtype="float32")
+        except Exception as e:
+            for request in batch:
+                request.error = e
+                request.done = True
+            return
+
+        offset = 0
+        for request in batch:
+            request.result = vectors[offset:offset + len(request.texts)]
+            request.done = True
+            offset += len(request.texts)
+
+        self.requests += len(batch)
+        self.batches += 1
+        metrics.inc(f"embedding.{self.name}.requests", len(batch))
+        metrics.inc(f"embedding.{self.name}.batches")
+
+    def stats(self):
+        return {
+            "memory_mb": round(self.memory_bytes() / (1024 * 1024), 1),
+            "requests": self.requests,
+            "batches": self.batches,
+            "avg_batch_requests": round(self.requests / self.batches, 2) if self.batches else 0.0
+        }
+
+
+# --------------------------------------------------
+# Registry
+# --------------------------------------------------
+
+def get_model(name=DEFAULT_MODEL):
+    """
+    Shared model instance, loaded on first use.
+    """
+    model = _models.get(name)
+    if model is not None:
+        return model
+
+    with _lock:
+        if name not in _models:
+            _models[name] = SharedEmbeddingModel(name)
+        return _models[name]
+
+
+def loaded_models():
+    """
+    Stats (memory, requests, batching) per loaded model.
+    """
+    return {name: model.stats() for name, model in _models.items()}
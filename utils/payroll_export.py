@@ -0,0 +1,195 @@
+# utils/payroll_export.py
+# Streaming payroll export of attendance (CSV / JSONL / Parquet)
+# Rows are read and written chunk by chunk, so memory stays constant
+# no matter how many years are exported.
+
+import argparse
+import csv
+import json
+from datetime import datetime, timedelta
+
+from db.database import get_departments, iter_attendance_with_employees
+
+
+EXPORT_COLUMNS = [
+    "employee_id",
+    "name",
+    "email",
+    "department",
+    "date",
+    "start_time",
+    "end_time",
+    "working_hours"
+]
+
+SUPPORTED_FORMATS = ["csv", "jsonl", "parquet"]
+
+
+# --------------------------------------------------
+# Helpers
+# --------------------------------------------------
+
+def _date_windows(start_date, end_date, chunk_days):
+    """
+    Split [start_date, end_date] into consecutive windows of chunk_days.
+    """
+    current = datetime.strptime(start_date, "%Y-%m-%d").date()
+    last = datetime.strptime(end_date, "%Y-%m-%d").date()
+
+    while current <= last:
+        window_end = min(current + timedelta(days=chunk_days - 1), last)
+        yield current.isoformat(), window_end.isoformat()
+        current = window_end + timedelta(days=1)
+
+
+def iter_payroll_batches(start_date, end_date, department=None, chunk_days=31, batch_size=1000):
+    """
+    Yield batches of export rows, chunked by date window and department.
+    """
+    departments = [department.upper()] if department else get_departments()
+
+    for window_start, window_end in _date_windows(start_date, end_date, chunk_days):
+        for dept in departments:
+            for rows in iter_attendance_with_employees(
+                window_start, window_end, department=dept, batch_size=batch_size
+            ):
+                for row in rows:
+                    row["working_hours"] = round(row.pop("duration_minutes") / 60, 2)
+                yield rows
+
+
+# --------------------------------------------------
+# Writers (one batch at a time)
+# --------------------------------------------------
+
+class _CsvWriter:
+    def __init__(self, file_path):
+        self.file = open(file_path, "w", newline="", encoding="utf-8")
+        self.writer = csv.DictWriter(self.file, fieldnames=EXPORT_COLUMNS)
+        self.writer.writeheader()
+
+    def write_batch(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+
+class _JsonlWriter:
+    def __init__(self, file_path):
+        self.file = open(file_path, "w", encoding="utf-8")
+
+    def write_batch(self, rows):
+        self.file.writelines(json.dumps(row) + "\n" for row in rows)
+
+    def close(self):
+        self.file.close()
+
+
+class _ParquetWriter:
+    def __init__(self, file_path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet export requires pyarrow (pip install pyarrow).")
+
+        self.pa = pa
+        self.schema = pa.schema([
+            ("employee_id", pa.int64()),
+            ("name", pa.string()),
+            ("email", pa.string()),
+            ("department", pa.string()),
+            ("date", pa.string()),
+            ("start_time", pa.string()),
+            ("end_time", pa.string()),
+            ("working_hours", pa.float64())
+        ])
+        self.writer = pq.ParquetWriter(file_path, self.schema)
+
+    def write_batch(self, rows):
+        # Each batch becomes one row group
+        table = self.pa.Table.from_pylist(rows, schema=self.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        self.writer.close()
+
+
+WRITERS = {
+    "csv": _CsvWriter,
+    "jsonl": _JsonlWriter,
+    "parquet": _ParquetWriter
+}
+
+
+# --------------------------------------------------
+# Public export API
+# --------------------------------------------------
+
+def export_attendance(file_path, fmt, start_date, end_date, department=None, chunk_days=31, batch_size=1000):
+    """
+    Export joined employee + attendance rows with working hours.
+    Written incrementally: only one batch is in memory at a time.
+    """
+    fmt = fmt.lower()
+
+    if fmt not in WRITERS:
+        return {
+            "status": "error",
+            "message": f"Unsupported format '{fmt}'. Use one of: {', '.join(SUPPORTED_FORMATS)}."
+        }
+
+    writer = WRITERS[fmt](file_path)
+    row_count = 0
+
+    try:
+        for rows in iter_payroll_batches(
+            start_date, end_date,
+            department=department,
+            chunk_days=chunk_days,
+            batch_size=batch_size
+        ):
+            writer.write_batch(rows)
+            row_count += len(rows)
+    finally:
+        writer.close()
+
+    return {
+        "status": "success",
+        "message": "Attendance export completed.",
+        "file_path": file_path,
+        "rows": row_count
+    }
+
+
+# --------------------------------------------------
+# Batch command
+# --------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Export attendance for payroll.")
+    parser.add_argument("output", help="Output file path")
+    parser.add_argument("--format", choices=SUPPORTED_FORMATS, default="csv")
+    parser.add_argument("--from", dest="start_date", required=True, help="YYYY-MM-DD")
+    parser.add_argument("--to", dest="end_date", required=True, help="YYYY-MM-DD")
+    parser.add_argument("--department", default=None)
+    parser.add_argument("--chunk-days", type=int, default=31)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    result = export_attendance(
+        args.output,
+        args.format,
+        args.start_date,
+        args.end_date,
+        department=args.department,
+        chunk_days=args.chunk_days,
+        batch_size=args.batch_size
+    )
+
+    print(result.get("message"), f"({result.get('rows', 0)} rows)")
+
+
+if __name__ == "__main__":
+    main()
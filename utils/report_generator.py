@@ -8,14 +8,19 @@ from reportlab.pdfgen import canvas
 from reportlab.lib import colors
 from reportlab.platypus import Table, TableStyle
 
+from utils.metrics import timed
 
+REPORTS_DIR = os.environ.get("HR_REPORTS_DIR", "reports")
+
+
+@timed("pdf.generate_daily_report")
 def generate_daily_report_pdf(report_data):
     """
     Generate a structured Daily Work Report PDF.
     """
 
     # Ensure reports directory exists
-    reports_dir = "reports"
+    reports_dir = REPORTS_DIR
     os.makedirs(reports_dir, exist_ok=True)
 
     employee_id = report_data["employee_id"]
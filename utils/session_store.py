@@ -0,0 +1,217 @@
+# utils/session_store.py
+# Conversation state keyed by session id
+# Thread-safe, with idle-session TTL eviction to bound memory
+# SharedSessionStore keeps the states in a SQLite file instead, so
+# several processes (prefork workers) can continue the same session
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+DEFAULT_SESSION_ID = "default"
+DEFAULT_TTL_SECONDS = 30 * 60
+
+DEFAULT_SHARED_PATH = Path(__file__).resolve().parent.parent / "db" / "sessions.db"
+SHARED_SESSIONS_PATH = os.environ.get("HR_SESSION_DB", str(DEFAULT_SHARED_PATH))
+
+
+def new_state():
+    """
+    Fresh (idle) conversation state.
+    """
+    return {
+        "current_intent": None,
+        "pending_data": {},
+        "expected_field": None
+    }
+
+
+class SessionStore:
+    """
+    SessionStore handles:
+    - One conversation state per session id
+    - Serialising turns of the same session (per-session lock)
+    - Evicting sessions idle for longer than ttl_seconds
+    """
+
+    def __init__(self, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
+    # -------------------------
+    # Internal helpers
+    # -------------------------
+    def _get_entry(self, session_id):
+        now = time.monotonic()
+
+        with self._lock:
+            if now - self._last_sweep >= self.ttl_seconds / 4:
+                self._evict_expired(now)
+
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                entry = {
+                    "state": new_state(),
+                    "lock": threading.Lock(),
+                    "last_seen": now
+                }
+                self._sessions[session_id] = entry
+
+            entry["last_seen"] = now
+            return entry
+
+    def _evict_expired(self, now):
+        """
+        Drop idle sessions. Caller must hold self._lock.
+        Sessions in the middle of a turn are never evicted.
+        """
+        self._last_sweep = now
+
+        for session_id, entry in list(self._sessions.items()):
+            if now - entry["last_seen"] < self.ttl_seconds:
+                continue
+            if not entry["lock"].acquire(blocking=False):
+                continue
+            try:
+                del self._sessions[session_id]
+            finally:
+                entry["lock"].release()
+
+    # -------------------------
+    # Public API
+    # -------------------------
+    @contextmanager
+    def session(self, session_id=DEFAULT_SESSION_ID):
+        """
+        Lock a session for one turn and yield its state dict.
+        The dict is mutated in place by the caller.
+        """
+        entry = self._get_entry(session_id)
+
+        with entry["lock"]:
+            yield entry["state"]
+            entry["last_seen"] = time.monotonic()
+
+    def has_active_state(self, session_id=DEFAULT_SESSION_ID):
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            return entry is not None and entry["state"]["current_intent"] is not None
+
+    def reset(self, session_id=DEFAULT_SESSION_ID):
+        with self.session(session_id) as state:
+            state.clear()
+            state.update(new_state())
+
+    def evict_expired(self):
+        with self._lock:
+            self._evict_expired(time.monotonic())
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
+
+
+class SharedSessionStore(SessionStore):
+    """
+    SessionStore whose states live in a SQLite file shared by all
+    processes: each turn loads the session's state and saves it back,
+    so a conversation may continue on any worker.
+    Only sessions in the middle of a flow are stored.
+    Turns of one session are serialised within a process; the same
+    session sending concurrent turns to two workers is last-write-wins.
+    """
+
+    def __init__(self, path=SHARED_SESSIONS_PATH, ttl_seconds=DEFAULT_TTL_SECONDS):
+        super().__init__(ttl_seconds=ttl_seconds)
+        self.path = path
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        try:
+            # Readers never wait for the writer of another session
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    session_id TEXT PRIMARY KEY,
+                    state TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    # -------------------------
+    # Persistence
+    # -------------------------
+    def _load(self, session_id):
+        conn = self._connect()
+        try:
+            row = conn.execute("""
+                SELECT state FROM sessions
+                WHERE session_id = ? AND updated_at >= ?
+            """, (session_id, time.time() - self.ttl_seconds)).fetchone()
+        finally:
+            conn.close()
+
+        return json.loads(row[0]) if row else new_state()
+
+    def _save(self, session_id, state):
+        conn = self._connect()
+        try:
+            if state.get("current_intent") is None:
+                conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            else:
+                conn.execute("""
+                    INSERT INTO sessions (session_id, state, updated_at)
+                    VALUES (?, ?, ?)
+                    ON CONFLICT (session_id) DO UPDATE SET
+                        state = excluded.state,
+                        updated_at = excluded.updated_at
+                """, (session_id, json.dumps(state), time.time()))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _evict_expired(self, now):
+        super()._evict_expired(now)
+
+        conn = self._connect()
+        try:
+            conn.execute(
+                "DELETE FROM sessions WHERE updated_at < ?",
+                (time.time() - self.ttl_seconds,)
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    # -------------------------
+    # Public API
+    # -------------------------
+    @contextmanager
+    def session(self, session_id=DEFAULT_SESSION_ID):
+        entry = self._get_entry(session_id)
+
+        with entry["lock"]:
+            state = entry["state"]
+            state.clear()
+            state.update(self._load(session_id))
+
+            try:
+                yield state
+            finally:
+                self._save(session_id, state)
+            entry["last_seen"] = time.monotonic()
+
+    def has_active_state(self, session_id=DEFAULT_SESSION_ID):
+        return self._load(session_id)["current_intent"] is not None
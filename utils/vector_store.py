@@ -1,31 +1,52 @@
 # utils/vector_store.py
 # Vector database for HR policies using FAISS
 # Handles badly formatted (character-per-line) text safely
+# Reloads in the background when the policy file changes (hot reload)
 
 import os
+import threading
+
 import faiss
 import numpy as np
-from sentence_transformers import SentenceTransformer
+from utils import metrics
+from utils.metrics import span, timed
+from utils.model_registry import DEFAULT_MODEL, get_model
+
+
+# Seconds between policy file checks (0 disables hot reload)
+WATCH_INTERVAL_SECONDS = float(os.environ.get("HR_POLICY_WATCH_SECONDS", "2"))
 
 
 class VectorStore:
     def __init__(self, policy_file_path: str):
         self.policy_file_path = policy_file_path
-        self.model = SentenceTransformer("all-MiniLM-L6-v2")
-        self.index = None
-        self.documents = []
+        # Shared with every other user of the same model
+        self.model = get_model(DEFAULT_MODEL)
 
-    def load(self):
-        """
-        Load policies from file, split by POLICY headings,
-        create embeddings, and build FAISS index.
-        """
-        if not os.path.exists(self.policy_file_path):
-            raise FileNotFoundError("HR policy file not found.")
+        # (documents, index) swapped as one object, so a search never
+        # mixes the documents of one version with the index of another
+        self._snapshot = ([], None)
+
+        # Chunk text -> embedding, so a reload only encodes changed chunks
+        self._vectors = {}
+        self._file_stamp = None
 
-        with open(self.policy_file_path, "r", encoding="utf-8") as f:
-            text = f.read()
+        self._watch_interval = None
+        self._stop_watching = threading.Event()
+        self._reload_lock = threading.Lock()
 
+    @property
+    def documents(self):
+        return self._snapshot[0]
+
+    @property
+    def index(self):
+        return self._snapshot[1]
+
+    def _split_policies(self, text):
+        """
+        Split policy text into one chunk per POLICY heading.
+        """
         # 🔥 CRITICAL FIX: split by POLICY titles
         raw_policies = []
         buffer = ""
@@ -48,17 +69,102 @@ class VectorStore:
         if buffer:
             raw_policies.append(buffer.strip())
 
-        self.documents = raw_policies
+        return raw_policies
+
+    def _stamp(self):
+        stat = os.stat(self.policy_file_path)
+        return stat.st_mtime_ns, stat.st_size
+
+    @timed("vector.load")
+    def load(self):
+        """
+        Load policies from file, split by POLICY headings,
+        create embeddings, and build FAISS index.
+        Only chunks not seen before are encoded; the new index
+        replaces the old one in a single assignment.
+        """
+        with self._reload_lock:
+            if not os.path.exists(self.policy_file_path):
+                raise FileNotFoundError("HR policy file not found.")
+
+            stamp = self._stamp()
+
+            with open(self.policy_file_path, "r", encoding="utf-8") as f:
+                text = f.read()
+
+            documents = self._split_policies(text)
+
+            if not documents:
+                raise ValueError("No HR policies found.")
+
+            changed = [d for d in documents if d not in self._vectors]
+            if changed:
+                encoded = np.array(self.model.encode(changed)).astype("float32")
+                self._vectors.update(zip(changed, encoded))
+            metrics.inc("vector.encoded_chunks", len(changed))
+
+            embeddings = np.stack([self._vectors[d] for d in documents])
+
+            dimension = embeddings.shape[1]
+            index = faiss.IndexFlatL2(dimension)
+            index.add(embeddings)
 
-        if not self.documents:
-            raise ValueError("No HR policies found.")
+            # Forget chunks that were removed from the file
+            self._vectors = {d: self._vectors[d] for d in documents}
 
-        embeddings = self.model.encode(self.documents)
-        embeddings = np.array(embeddings).astype("float32")
+            self._snapshot = (documents, index)
+            self._file_stamp = stamp
 
-        dimension = embeddings.shape[1]
-        self.index = faiss.IndexFlatL2(dimension)
-        self.index.add(embeddings)
+    # -------------------------
+    # Hot reload
+    # -------------------------
+    def reload_if_changed(self):
+        """
+        Rebuild when the policy file changed since the last load.
+        On failure the current index keeps serving.
+        """
+        try:
+            stamp = self._stamp()
+        except OSError:
+            stamp = None
+
+        if stamp == self._file_stamp:
+            return False
+
+        try:
+            self.load()
+        except (OSError, ValueError) as e:
+            # Not retried until the file changes again
+            self._file_stamp = stamp
+            print("⚠️ HR policy reload failed:", e)
+            return False
+
+        metrics.inc("vector.reloads")
+        return True
+
+    def _watch(self):
+        while not self._stop_watching.wait(self._watch_interval):
+            self.reload_if_changed()
+
+    def _start_watch_thread(self):
+        self._stop_watching.clear()
+        threading.Thread(target=self._watch, name="policy-watch", daemon=True).start()
+
+    def start_watching(self, interval=WATCH_INTERVAL_SECONDS):
+        """
+        Poll the policy file's mtime/size in a background thread and
+        reload on change. In a process that forks (prefork parent), call
+        it in the children only: a fork while the watcher holds the
+        reload or model lock would hand the child a lock nobody releases.
+        """
+        if not interval or self._watch_interval is not None:
+            return
+
+        self._watch_interval = interval
+        self._start_watch_thread()
+
+    def stop_watching(self):
+        self._stop_watching.set()
 
     # -------------------------
     # Return ALL policies
@@ -69,17 +175,22 @@ class VectorStore:
     # -------------------------
     # Semantic search
     # -------------------------
+    @timed("vector.search")
     def search(self, query: str, top_k: int = 1):
-        if not query or self.index is None:
+        documents, index = self._snapshot
+
+        if not query or index is None:
             return None
 
-        q_vec = self.model.encode([query])
-        q_vec = np.array(q_vec).astype("float32")
+        with span("vector.encode"):
+            q_vec = self.model.encode([query])
+            q_vec = np.array(q_vec).astype("float32")
 
-        _, indices = self.index.search(q_vec, top_k)
+        with span("vector.faiss_search"):
+            _, indices = index.search(q_vec, top_k)
         idx = indices[0][0]
 
-        if idx < 0 or idx >= len(self.documents):
+        if idx < 0 or idx >= len(documents):
             return None
 
-        return self.documents[idx]
\ No newline at end of file
+        return documents[idx]
\ No newline at end of file